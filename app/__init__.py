@@ -10,8 +10,18 @@ def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
     
+    # File uploads are hashed into the certificate store as they are parsed
+    from app.storage import UploadRequest
+    app.request_class = UploadRequest
+    
+    # Pool sizing and the SQLite performance profile
+    from app.database import engine_options, tune_engine
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+    
     # Initialize extensions
     db.init_app(app)
+    with app.app_context():
+        tune_engine(db.engine, app.config)
     login_manager.init_app(app)
     login_manager.login_view = 'main.login'
     login_manager.login_message = 'Please log in to access this page.'
@@ -19,15 +29,26 @@ def create_app():
     
     @login_manager.user_loader
     def load_user(user_id):
-        from app.models import User
-        return User.query.get(int(user_id))
+        from app.user_cache import load_user as load_cached_user
+        return load_cached_user(int(user_id))
     
     # Register blueprints
     from app.routes import main
     app.register_blueprint(main)
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    # Keep the skill indexes, facet counts, job change log, caches and file
+    # reference counts in sync with writes
+    from app import skill_index, similarity, facets, change_feed, user_cache, dashboard_stats, storage
+    
+    from app.cli import register_commands
+    register_commands(app)
+    
+    # Schema setup is an explicit step (flask bootstrap / migrate_db.py);
+    # DB_AUTO_CREATE restores creating it on every boot for throwaway databases
+    if app.config['DB_AUTO_CREATE']:
+        with app.app_context():
+            db.create_all()
+            from app.search import install_search_index
+            install_search_index()
     
     return app
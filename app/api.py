@@ -0,0 +1,115 @@
+import hashlib
+import json
+from datetime import timezone
+from sqlalchemy import select, func
+from app import db
+from app.models import Job, JobChange
+from app.pagination import encode_cursor, decode_cursor, seek_condition
+
+# Columns partners may request with ?fields=; the default keeps the original payload
+API_JOB_FIELDS = ('id', 'title', 'company', 'description', 'requirements',
+                  'accessibility_features', 'salary_range', 'location',
+                  'required_skills', 'experience_required', 'work_type', 'created_at')
+DEFAULT_JOB_FIELDS = ('id', 'title', 'company', 'location', 'accessibility_features', 'created_at')
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+# Newest first; id breaks ties between jobs posted in the same instant
+FEED_KEYS = [(Job.created_at, True), (Job.id, True)]
+
+def parse_fields(fields_param):
+    """Requested field names in API order; raises ValueError for unknown fields"""
+    if not fields_param:
+        return DEFAULT_JOB_FIELDS
+    requested = {name.strip() for name in fields_param.split(',') if name.strip()}
+    unknown = requested - set(API_JOB_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return tuple(name for name in API_JOB_FIELDS if name in requested)
+
+def parse_limit(limit_param):
+    """Page size from ?limit=, clamped to 1..MAX_LIMIT"""
+    if not limit_param:
+        return DEFAULT_LIMIT
+    return max(1, min(MAX_LIMIT, int(limit_param)))
+
+def feed_validators(params):
+    """(ETag, Last-Modified, change seq, job count) for the job feed, from one aggregate query.
+
+    The ETag covers the newest posting, the job count, the newest change
+    log entry (so edits and deletions are seen) and the request parameters
+    that shape the response.
+    """
+    newest, total, change_seq = db.session.execute(select(
+        func.max(Job.created_at),
+        func.count(Job.id),
+        select(func.max(JobChange.seq)).scalar_subquery()
+    )).one()
+    change_seq = change_seq or 0
+    digest = hashlib.sha1(
+        json.dumps([newest.isoformat() if newest else None, total, change_seq, params]).encode()
+    ).hexdigest()
+    last_modified = newest.replace(tzinfo=timezone.utc) if newest else None
+    return digest, last_modified, change_seq, total
+
+def not_modified(request, etag, last_modified):
+    """Whether a conditional GET can be answered with 304"""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified:
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+def serialize_job(row, fields):
+    """JSON-ready dict of the requested fields of a job row"""
+    item = {}
+    for name in fields:
+        value = row[name]
+        if name == 'created_at' and value is not None:
+            value = value.strftime('%Y-%m-%d')
+        item[name] = value
+    return item
+
+def stream_jobs(fields, limit, cursor=None, ndjson=False, total=None, batch_size=500):
+    """Generator of response chunks for one feed page, read with a server-side cursor.
+
+    JSON responses end with "total" (jobs in the catalogue), "count" (jobs
+    on this page) and "next_cursor" after the jobs array;
+    NDJSON responses end with a {"next_cursor": ...} line when more pages exist.
+    """
+    key_columns = [expression for expression, _ in FEED_KEYS]
+    columns = [getattr(Job, name) for name in fields]
+    statement = select(*columns, *[c.label(f'_key_{c.key}') for c in key_columns])
+    values = decode_cursor(cursor, len(FEED_KEYS))
+    if values is not None:
+        statement = statement.where(seek_condition(FEED_KEYS, values))
+    statement = statement.order_by(*[c.desc() for c in key_columns]).limit(limit + 1)
+
+    rows = db.session.execute(statement, execution_options={'yield_per': batch_size})
+
+    if not ndjson:
+        yield '{"jobs": ['
+    sent = 0
+    next_cursor = None
+    last_key = None
+    for row in rows:
+        mapping = row._mapping
+        if sent == limit:
+            next_cursor = encode_cursor(last_key)
+            break
+        item = json.dumps(serialize_job(mapping, fields))
+        if ndjson:
+            yield item + '\n'
+        else:
+            yield (', ' if sent else '') + item
+        last_key = [mapping[f'_key_{c.key}'] for c in key_columns]
+        sent += 1
+    rows.close()
+
+    if ndjson:
+        if next_cursor:
+            yield json.dumps({'next_cursor': next_cursor}) + '\n'
+    else:
+        yield '], "total": %s, "count": %d, "next_cursor": %s}' % (
+            json.dumps(total), sent, json.dumps(next_cursor))
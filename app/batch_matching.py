@@ -0,0 +1,256 @@
+import numpy as np
+from app.utils import LRUCache
+from app.features import stored_user_features, stored_job_features, split_terms
+
+# Weighted overall score, in the order the components are summed
+MATCH_WEIGHTS = {
+    'skills': 0.35,
+    'experience': 0.25,
+    'accessibility': 0.20,
+    'location': 0.10,
+    'salary': 0.10
+}
+
+# Score component columns, aligned with the weight keys above
+COMPONENTS = ('skills_match', 'experience_match', 'accessibility_match',
+              'location_match', 'salary_match')
+WEIGHT_KEYS = ('skills', 'experience', 'accessibility', 'location', 'salary')
+
+class TokenMatrix:
+    """Sparse (row, token) encoding of one token list per row"""
+
+    def __init__(self, token_lists):
+        self.vocab = {}
+        rows, tokens = [], []
+        set_rows, set_tokens = [], []
+        lengths = []
+        for row, token_list in enumerate(token_lists):
+            lengths.append(len(token_list))
+            seen = set()
+            for token in token_list:
+                index = self.vocab.setdefault(token, len(self.vocab))
+                rows.append(row)
+                tokens.append(index)
+                if index not in seen:
+                    seen.add(index)
+                    set_rows.append(row)
+                    set_tokens.append(index)
+
+        self.size = len(lengths)
+        self.terms = list(self.vocab)
+        self.rows = np.array(rows, dtype=np.int64)
+        self.tokens = np.array(tokens, dtype=np.int64)
+        self.set_rows = np.array(set_rows, dtype=np.int64)
+        self.set_tokens = np.array(set_tokens, dtype=np.int64)
+        self.lengths = np.array(lengths, dtype=np.float64)
+
+    def term_mask(self, predicate):
+        """Boolean vector over the vocabulary"""
+        return np.array([predicate(term) for term in self.terms], dtype=bool)
+
+    def count_distinct(self, mask):
+        """Per row, number of distinct tokens selected by mask"""
+        return np.bincount(self.set_rows, weights=mask[self.set_tokens],
+                           minlength=self.size)
+
+    def count_all(self, mask):
+        """Per row, number of list entries (with repeats) selected by mask"""
+        return np.bincount(self.rows, weights=mask[self.tokens],
+                           minlength=self.size)
+
+def _related(a, b):
+    # Partial skill match, e.g. "python" and "python programming"
+    return a in b or b in a
+
+def popcount(values):
+    """Number of set bits per element of an integer array (SWAR popcount)"""
+    v = values.astype(np.uint64)
+    v = v - ((v >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    v = (v & np.uint64(0x3333333333333333)) + ((v >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    v = (v + (v >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return ((v * np.uint64(0x0101010101010101)) >> np.uint64(56)).astype(np.int64)
+
+def _optional(values):
+    return np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+
+class EncodedUsers:
+    """Pre-encoded matching features for a batch of job seekers"""
+
+    def __init__(self, users):
+        features = [stored_user_features(u) for u in users]
+        self.skill_lists = [split_terms(f['skill_list'], ',') for f in features]
+        self.skills = TokenMatrix(self.skill_lists)
+        self.experience = np.array([f['experience_rank'] for f in features], dtype=np.int64)
+        self.has_location = np.array([bool(u.preferred_location) for u in users], dtype=bool)
+        self.location_sets = [set(split_terms(f['location_terms'], ' ')) for f in features]
+        self.location = TokenMatrix([sorted(terms) for terms in self.location_sets])
+        self.needs_access = np.array(
+            [bool(u.disability_type) or bool(u.accessibility_needs) for u in users], dtype=bool)
+        self.access_mask = np.array([f['accessibility_mask'] or 0 for f in features], dtype=np.int64)
+        self.salary = _optional([f['salary_target'] for f in features])
+
+class EncodedJobs:
+    """Pre-encoded matching features for a batch of jobs"""
+
+    def __init__(self, jobs):
+        features = [stored_job_features(j) for j in jobs]
+        self.skill_lists = [split_terms(f['skill_list'], ',') for f in features]
+        self.skills = TokenMatrix(self.skill_lists)
+        self.experience = np.array([f['experience_rank'] for f in features], dtype=np.int64)
+        self.has_location = np.array([bool(j.location) for j in jobs], dtype=bool)
+        self.remote = np.array([bool(f['remote']) for f in features], dtype=bool)
+        self.location_sets = [set(split_terms(f['location_terms'], ' ')) for f in features]
+        self.location = TokenMatrix([sorted(terms) for terms in self.location_sets])
+        self.has_features = np.array([bool(j.accessibility_features) for j in jobs], dtype=bool)
+        self.access_mask = np.array([f['accessibility_mask'] or 0 for f in features], dtype=np.int64)
+        self.salary_min = _optional([f['salary_min'] for f in features])
+        self.salary_max = _optional([f['salary_max'] for f in features])
+
+def _experience_scores(user_level, job_level):
+    difference = np.abs(user_level - job_level)
+    scores = np.select([difference == 0, difference == 1, difference == 2],
+                       [100.0, 80.0, 60.0], default=40.0)
+    return np.where((user_level == 0) | (job_level == 0), 50.0, scores)
+
+def _location_scores(has_job_location, remote, has_user_location, common):
+    return np.where(~has_job_location | remote, 100.0,
+                    np.where(~has_user_location, 50.0,
+                             np.where(common > 0, 100.0, 20.0)))
+
+def _accessibility_scores(needs_access, has_features, keyword_matches):
+    bonus = np.minimum(40.0, keyword_matches * 10)
+    return np.where(~needs_access, 100.0,
+                    np.where(~has_features, 20.0, 60.0 + bonus))
+
+def _salary_scores(user_salary, job_min, job_max):
+    known = ~np.isnan(user_salary) & ~np.isnan(job_min)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        difference_percent = ((user_salary - job_max) / job_max) * 100
+    over = np.where(job_max == 0, 75.0, np.maximum(20.0, 80.0 - difference_percent))
+    scores = np.where(user_salary < job_min, 90.0, over)
+    scores = np.where((job_min <= user_salary) & (user_salary <= job_max), 100.0, scores)
+    return np.where(known, scores, 75.0)
+
+def _skills_scores(exact, partial, total):
+    with np.errstate(divide='ignore', invalid='ignore'):
+        scores = np.minimum(100.0, ((exact + partial) / total) * 100)
+    return np.where(total > 0, scores, 0.0)
+
+def _combine(components):
+    # (n, 5) component matrix, one column per entry in COMPONENTS
+    return np.column_stack([components[name] for name in COMPONENTS])
+
+def score_user_against_jobs(user, jobs):
+    """Score one seeker against many jobs; returns an (n_jobs, 5) component matrix"""
+    if not isinstance(jobs, EncodedJobs):
+        jobs = EncodedJobs(jobs)
+    encoded_user = EncodedUsers([user])
+
+    # Skills: distinct exact matches plus half a point per related user skill
+    user_skills = encoded_user.skill_lists[0]
+    user_skill_set = set(user_skills)
+    exact = jobs.skills.count_distinct(jobs.skills.term_mask(lambda t: t in user_skill_set))
+    partial = np.zeros(jobs.skills.size)
+    for skill in user_skills:
+        related = jobs.skills.term_mask(lambda t: _related(skill, t))
+        partial += 0.5 * (jobs.skills.count_distinct(related) > 0)
+    # Seekers without skills score 0, like jobs without required skills
+    total = jobs.skills.lengths if user_skills else np.zeros(jobs.skills.size)
+
+    user_location = encoded_user.location_sets[0]
+    common = jobs.location.count_distinct(jobs.location.term_mask(lambda t: t in user_location))
+    keyword_matches = popcount(jobs.access_mask & encoded_user.access_mask[0])
+
+    return _combine({
+        'skills_match': _skills_scores(exact, partial, total),
+        'experience_match': _experience_scores(encoded_user.experience[0], jobs.experience),
+        'location_match': _location_scores(
+            jobs.has_location, jobs.remote, encoded_user.has_location[0], common),
+        'accessibility_match': _accessibility_scores(
+            encoded_user.needs_access[0], jobs.has_features, keyword_matches),
+        'salary_match': _salary_scores(encoded_user.salary[0], jobs.salary_min, jobs.salary_max)
+    })
+
+def score_users_against_job(users, job):
+    """Score many seekers against one job; returns an (n_users, 5) component matrix"""
+    if not isinstance(users, EncodedUsers):
+        users = EncodedUsers(users)
+    encoded_job = EncodedJobs([job])
+
+    job_skills = encoded_job.skill_lists[0]
+    job_skill_set = set(job_skills)
+    exact = users.skills.count_distinct(users.skills.term_mask(lambda t: t in job_skill_set))
+    related = users.skills.term_mask(lambda t: any(_related(t, s) for s in job_skills))
+    partial = 0.5 * users.skills.count_all(related)
+    # Seekers without skills score 0, like jobs without required skills
+    total = np.where(users.skills.lengths > 0, float(len(job_skills)), 0.0)
+
+    job_location = encoded_job.location_sets[0]
+    common = users.location.count_distinct(users.location.term_mask(lambda t: t in job_location))
+    keyword_matches = popcount(users.access_mask & encoded_job.access_mask[0])
+
+    return _combine({
+        'skills_match': _skills_scores(exact, partial, total),
+        'experience_match': _experience_scores(users.experience, encoded_job.experience[0]),
+        'location_match': _location_scores(
+            encoded_job.has_location[0], encoded_job.remote[0], users.has_location, common),
+        'accessibility_match': _accessibility_scores(
+            users.needs_access, encoded_job.has_features[0], keyword_matches),
+        'salary_match': _salary_scores(
+            users.salary, encoded_job.salary_min[0], encoded_job.salary_max[0])
+    })
+
+def _memo_key(user, job):
+    user_id, job_id = getattr(user, 'id', None), getattr(job, 'id', None)
+    if user_id is None or job_id is None:
+        return None
+    return (user_id, getattr(user, 'profile_version', None),
+            job_id, getattr(job, 'version', None))
+
+class ScoringEngine:
+    """Vectorized match scorer with a compiled weight vector and a memo cache.
+    
+    Scores are memoized per (user id, profile version, job id, job version),
+    so a pair is only recomputed after one of its inputs changed.
+    """
+
+    def __init__(self, weights=None, cache_size=50000):
+        weights = weights or MATCH_WEIGHTS
+        self.weight_vector = np.array([weights[key] for key in WEIGHT_KEYS], dtype=np.float64)
+        self.cache = LRUCache(cache_size)
+
+    def _result(self, matrix):
+        # Row-wise sum of weighted columns, in the same order as a scalar sum
+        scores = {name: matrix[:, column] for column, name in enumerate(COMPONENTS)}
+        scores['overall'] = (matrix * self.weight_vector).sum(axis=1)
+        return scores
+
+    def _score_memoized(self, pairs, compute):
+        matrix = np.empty((len(pairs), len(COMPONENTS)), dtype=np.float64)
+        keys = [_memo_key(user, job) for user, job in pairs]
+        missing = []
+        for index, key in enumerate(keys):
+            row = self.cache.get(key) if key else None
+            if row is None:
+                missing.append(index)
+            else:
+                matrix[index] = row
+        if missing:
+            fresh = compute(missing)
+            matrix[missing] = fresh
+            for index, row in zip(missing, fresh):
+                if keys[index]:
+                    self.cache.put(keys[index], row)
+        return self._result(matrix)
+
+    def score_jobs(self, user, jobs):
+        """Score arrays for one seeker against many jobs (aligned with jobs)"""
+        return self._score_memoized(
+            [(user, job) for job in jobs],
+            lambda missing: score_user_against_jobs(user, [jobs[i] for i in missing]))
+
+    def score_users(self, users, job):
+        """Score arrays for many seekers against one job (aligned with users)"""
+        return self._score_memoized(
+            [(user, job) for user in users],
+            lambda missing: score_users_against_job([users[i] for i in missing], job))
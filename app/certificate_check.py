@@ -0,0 +1,186 @@
+import codecs
+import json
+import mmap
+import os
+import re
+import shutil
+import subprocess
+import zlib
+from datetime import datetime
+from flask import current_app
+from app import db
+from app.models import Application, StoredFile
+from app.storage import FILE_MODE, content_path, preview_path
+
+# PDF files may start with a little junk before the header, and end with
+# a few bytes after %%EOF (e.g. a newline added by a mail client)
+HEADER_WINDOW = 1024
+TRAILER_WINDOW = 2048
+
+# Compressed object streams are inflated with these caps, so a small
+# crafted upload cannot expand into hundreds of megabytes in a worker
+MAX_INFLATED_STREAM = 4 * 1024 * 1024  # Bytes per object stream
+MAX_INFLATED_TOTAL = 32 * 1024 * 1024  # Bytes per file
+
+PREVIEW_WIDTH = 800  # Pixels; pdftoppm keeps the aspect ratio
+PREVIEW_TIMEOUT = 60  # Seconds
+
+METADATA_KEYS = ('Title', 'Author', 'Subject', 'Creator', 'Producer', 'CreationDate', 'ModDate')
+
+HEADER = re.compile(rb'%PDF-(\d\.\d)')
+STARTXREF = re.compile(rb'startxref\s+(\d+)')
+XREF_TARGET = re.compile(rb'\s*(xref|\d+\s+\d+\s+obj)')
+PAGE_TREE_COUNT = re.compile(rb'/Type\s*/Pages\b[^>]*?/Count\s+(\d+)|/Count\s+(\d+)[^>]*?/Type\s*/Pages\b')
+OBJECT_STREAM = re.compile(rb'/Type\s*/ObjStm\b(?:(?!endobj).){0,500}?stream\r?\n', re.S)
+INFO_REFERENCE = re.compile(rb'/Info\s+(\d+)\s+(\d+)\s+R')
+PDF_ESCAPE = re.compile(rb'\\([nrtbf()\\]|[0-7]{1,3})')
+PDF_ESCAPES = {b'n': b'\n', b'r': b'\r', b't': b'\t', b'b': b'\b', b'f': b'\f'}
+
+class InvalidCertificate(ValueError):
+    """The uploaded file is not a readable PDF"""
+
+def _page_count(data):
+    counts = [int(a or b) for a, b in PAGE_TREE_COUNT.findall(data)]
+    if not counts:
+        # PDF 1.5+ may keep the page tree in compressed object streams
+        budget = MAX_INFLATED_TOTAL
+        for match in OBJECT_STREAM.finditer(data):
+            if budget <= 0:
+                break
+            end = data.find(b'endstream', match.end())
+            try:
+                inflated = zlib.decompressobj().decompress(
+                    data[match.end():end], min(MAX_INFLATED_STREAM, budget))
+            except zlib.error:
+                continue
+            budget -= len(inflated)
+            counts.extend(int(a or b) for a, b in PAGE_TREE_COUNT.findall(inflated))
+    # The root of the page tree counts every page below it
+    return max(counts) if counts else 0
+
+def _unescape(match):
+    escaped = match.group(1)
+    if escaped[:1].isdigit():
+        return bytes([int(escaped, 8) & 0xFF])
+    return PDF_ESCAPES.get(escaped, escaped)
+
+def _pdf_string(raw):
+    """Text of a PDF literal (...) or hex <...> string"""
+    if raw.startswith(b'<'):
+        digits = re.sub(rb'\s', b'', raw[1:-1])
+        if len(digits) % 2:
+            digits += b'0'  # A missing final digit counts as 0
+        raw = bytes.fromhex(digits.decode('ascii', 'ignore'))
+    else:
+        raw = PDF_ESCAPE.sub(_unescape, raw[1:-1])
+    if raw.startswith(codecs.BOM_UTF16_BE):
+        return raw[2:].decode('utf-16-be', 'replace')
+    return raw.decode('latin-1')
+
+def _metadata(data, trailer):
+    if b'/Encrypt' in trailer:
+        return {'encrypted': True}
+    references = INFO_REFERENCE.findall(trailer)
+    if not references:
+        return {}
+    number, generation = references[-1]
+    info = re.search(rb'(?<!\d)' + number + rb'\s+' + generation + rb'\s+obj\s*<<(.*?)>>\s*endobj',
+                     data, re.S)
+    if not info:
+        return {}
+    metadata = {}
+    for key in METADATA_KEYS:
+        value = re.search(rb'/' + key.encode() + rb'\s*(\((?:\\.|[^\\)])*\)|<[0-9A-Fa-f\s]*>)',
+                          info.group(1), re.S)
+        if value:
+            metadata[key.lower()] = _pdf_string(value.group(1))[:255]
+    return metadata
+
+def inspect_pdf(path):
+    """Structural check of a PDF file; returns {'version', 'pages', 'metadata'}.
+
+    Checks the header magic, that the file is complete (%%EOF and a
+    startxref offset pointing at a cross-reference table or stream) and
+    that it has pages. Raises InvalidCertificate otherwise.
+    """
+    if os.path.getsize(path) == 0:
+        raise InvalidCertificate('The file is empty')
+    with open(path, 'rb') as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        header = HEADER.search(data[:HEADER_WINDOW])
+        if not header:
+            raise InvalidCertificate('The file is not a PDF')
+        trailer = data[-TRAILER_WINDOW:]
+        offsets = STARTXREF.findall(trailer)
+        if b'%%EOF' not in trailer or not offsets:
+            raise InvalidCertificate('The PDF is incomplete or damaged')
+        offset = int(offsets[-1])
+        if offset >= len(data) or not XREF_TARGET.match(data, offset):
+            raise InvalidCertificate('The PDF cross-reference table is damaged')
+        pages = _page_count(data)
+        if not pages:
+            raise InvalidCertificate('The PDF has no pages')
+        return {'version': header.group(1).decode(), 'pages': pages,
+                'metadata': _metadata(data, trailer)}
+
+def render_preview(pdf_path, png_path):
+    """First page as a PNG through poppler's pdftoppm; False if it is missing or fails"""
+    command = shutil.which(current_app.config['PDFTOPPM_PATH'])
+    if not command:
+        return False
+    try:
+        result = subprocess.run(
+            [command, '-png', '-f', '1', '-l', '1', '-singlefile',
+             '-scale-to-x', str(PREVIEW_WIDTH), '-scale-to-y', '-1',
+             pdf_path, png_path[:-len('.png')]],
+            capture_output=True, timeout=PREVIEW_TIMEOUT
+        )
+    except (subprocess.TimeoutExpired, OSError):
+        return False
+    if result.returncode != 0 or not os.path.exists(png_path):
+        return False
+    os.chmod(png_path, FILE_MODE)
+    return True
+
+def check_stored_file(sha256):
+    """Validate one stored file and render its preview, unless already done"""
+    stored = db.session.get(StoredFile, sha256)
+    if stored is None or stored.check_status != 'pending':
+        return None
+
+    try:
+        info = inspect_pdf(content_path(sha256))
+    except InvalidCertificate as error:
+        stored.check_status = 'invalid'
+        stored.check_error = str(error)
+    except (OSError, ValueError) as error:
+        # Missing or unreadable file: record it rather than stay pending forever
+        print(f"⚠️ Certificate {sha256} could not be checked: {error}")
+        stored.check_status = 'error'
+        stored.check_error = 'The stored file could not be read'
+    else:
+        stored.check_status = 'valid'
+        stored.page_count = info['pages']
+        stored.pdf_metadata = json.dumps(dict(info['metadata'], version=info['version']))
+        stored.has_preview = render_preview(content_path(sha256), preview_path(sha256))
+    stored.checked_at = datetime.utcnow()
+    db.session.commit()
+    return {'status': stored.check_status, 'pages': stored.page_count, 'preview': stored.has_preview}
+
+def check_application_certificate(application_id):
+    """Task handler: check the certificate attached to an application"""
+    application = Application.query.get(application_id)
+    if not application or not application.certificate_sha256:
+        return None
+    return check_stored_file(application.certificate_sha256)
+
+def check_pending_certificates(batch_size=500):
+    """Check every stored file still pending (e.g. imported legacy uploads); returns how many"""
+    checked = 0
+    while True:
+        digests = db.session.query(StoredFile.sha256).filter(StoredFile.check_status == 'pending')\
+                                                     .limit(batch_size).all()
+        if not digests:
+            return checked
+        for (digest,) in digests:
+            check_stored_file(digest)
+            checked += 1
@@ -0,0 +1,74 @@
+from datetime import datetime
+from sqlalchemy import event, func, select
+from app import db
+from app.models import Job, JobChange
+from app.api import serialize_job
+
+# PostgreSQL hands out sequence values at insert time but they become
+# visible at commit, possibly out of order: a reader could move past a
+# seq whose transaction had not committed yet and never see it. Writers
+# take this transaction-level lock first, so the log commits in seq order
+# (SQLite already allows a single writer at a time).
+LOG_LOCK_KEY = 0x4A4F4243  # "JOBC"
+
+def _record(connection, job_id, op):
+    if connection.dialect.name == 'postgresql':
+        connection.execute(select(func.pg_advisory_xact_lock(LOG_LOCK_KEY)))
+    connection.execute(JobChange.__table__.insert().values(
+        job_id=job_id, op=op, changed_at=datetime.utcnow()))
+
+def changes_since(since, fields, limit):
+    """Changes after seq since, one entry per job (its latest change in the page).
+
+    Returns (entries, next_since, has_more). Inserted and updated jobs carry
+    their current fields; deleted ones carry only their id.
+    """
+    changes = db.session.execute(
+        select(JobChange.seq, JobChange.job_id, JobChange.op, JobChange.changed_at)
+        .where(JobChange.seq > since)
+        .order_by(JobChange.seq)
+        .limit(limit + 1)
+    ).all()
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    if not changes:
+        return [], since, False
+
+    latest = {}
+    for change in changes:
+        latest[change.job_id] = change
+
+    live_ids = [job_id for job_id, change in latest.items() if change.op != 'delete']
+    jobs = {}
+    if live_ids:
+        columns = [getattr(Job, name) for name in fields]
+        rows = db.session.execute(select(Job.id.label('_job_id'), *columns)
+                                  .where(Job.id.in_(live_ids))).all()
+        jobs = {row._mapping['_job_id']: serialize_job(row._mapping, fields) for row in rows}
+
+    entries = []
+    for change in sorted(latest.values(), key=lambda c: c.seq):
+        job = jobs.get(change.job_id)
+        # A job deleted after this change was logged is reported as deleted
+        op = change.op if change.op == 'delete' or job else 'delete'
+        entries.append({
+            'seq': change.seq,
+            'op': op,
+            'job_id': change.job_id,
+            'changed_at': change.changed_at.isoformat() if change.changed_at else None,
+            'job': job if op != 'delete' else None
+        })
+    return entries, changes[-1].seq, has_more
+
+# Log every job write inside the same flush, so the log commits with it
+@event.listens_for(Job, 'after_insert')
+def _log_insert(mapper, connection, job):
+    _record(connection, job.id, 'insert')
+
+@event.listens_for(Job, 'after_update')
+def _log_update(mapper, connection, job):
+    _record(connection, job.id, 'update')
+
+@event.listens_for(Job, 'after_delete')
+def _log_delete(mapper, connection, job):
+    _record(connection, job.id, 'delete')
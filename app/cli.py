@@ -0,0 +1,29 @@
+import click
+
+def register_commands(app):
+    """flask bootstrap / flask seed / flask prune-certificates"""
+
+    @app.cli.command('bootstrap')
+    def bootstrap():
+        """Create or upgrade the schema (tables, indexes, full-text search)"""
+        from app.migrations import upgrade
+        applied = upgrade()
+        click.echo(f"✅ Applied {len(applied)} migrations" if applied else "✅ Database is up to date")
+
+    @app.cli.command('seed')
+    def seed():
+        """Insert the demo accounts and sample jobs if missing"""
+        from app.seed import create_sample_data, create_demo_accounts
+        create_demo_accounts()
+        create_sample_data()
+        click.echo("✅ Demo data ready")
+
+    @app.cli.command('prune-certificates')
+    @click.option('--grace-hours', default=24, show_default=True,
+                  help='Keep unreferenced files this long (uploads still being applied with)')
+    def prune_certificates(grace_hours):
+        """Delete certificate files no application refers to any more"""
+        from datetime import timedelta
+        from app.storage import prune_unreferenced
+        removed = prune_unreferenced(timedelta(hours=grace_hours))
+        click.echo(f"✅ Removed {removed} unreferenced certificate files")
@@ -10,14 +10,49 @@ class Config:
     # Database
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or 'sqlite:///pwd_jobs.db'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DB_AUTO_CREATE = os.environ.get('DB_AUTO_CREATE', 'false').lower() in ['true', 'on', '1']
+    
+    # SQLite profile: 'performance' (WAL + pragmas below) or 'default' (SQLite's own settings)
+    SQLITE_PROFILE = os.environ.get('SQLITE_PROFILE', 'performance')
+    SQLITE_SYNCHRONOUS = os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL')  # Durable in WAL mode except on power loss
+    SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS') or 5000)
+    SQLITE_MMAP_SIZE = int(os.environ.get('SQLITE_MMAP_SIZE') or 256 * 1024 * 1024)
+    SQLITE_CACHE_SIZE_KB = int(os.environ.get('SQLITE_CACHE_SIZE_KB') or 64 * 1024)
+    
+    # Connection pool (per process); PostgreSQL also pings connections before use
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 5)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 10)
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT') or 30)
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE') or 1800)  # Seconds
     
     # Session Management (Accessibility: No time limits for cognitive disabilities)
     PERMANENT_SESSION_LIFETIME = timedelta(hours=24)
     WTF_CSRF_TIME_LIMIT = None  # Removed for accessibility compliance
     
+    # Logged-in user identity cache (per process); 0 disables it
+    USER_CACHE_TTL = int(os.environ.get('USER_CACHE_TTL') or 30)  # Seconds
+    USER_CACHE_SIZE = int(os.environ.get('USER_CACHE_SIZE') or 1024)
+    
+    # Background match generation
+    MATCH_WORKERS = int(os.environ.get('MATCH_WORKERS') or 2)
+    MATCH_TASKS_INLINE = os.environ.get('MATCH_TASKS_INLINE', 'false').lower() in ['true', 'on', '1']
+    MATCH_TOP_K = int(os.environ.get('MATCH_TOP_K') or 20)  # Pending matches kept per seeker (0 = all)
+    
+    # Site-wide dashboard figures (total jobs, recent jobs) cache, per process
+    DASHBOARD_CACHE_TTL = int(os.environ.get('DASHBOARD_CACHE_TTL') or 30)  # Seconds
+    
+    # Job listing page size (keyset paginated)
+    JOBS_PER_PAGE = int(os.environ.get('JOBS_PER_PAGE') or 20)
+    
     # File Upload Limits
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
     
+    # Content-addressed certificate store (files named by SHA-256, shared between applications)
+    CERTIFICATE_UPLOAD_DIR = os.environ.get('CERTIFICATE_UPLOAD_DIR') or 'uploads/certificates'
+    PDFTOPPM_PATH = os.environ.get('PDFTOPPM_PATH') or 'pdftoppm'  # Poppler, for certificate previews (optional)
+    # nginx internal location aliased to CERTIFICATE_UPLOAD_DIR; downloads are then served by nginx
+    CERTIFICATE_ACCEL_REDIRECT = os.environ.get('CERTIFICATE_ACCEL_REDIRECT')  # e.g. /protected-certificates
+    
     # Email Configuration (for future notifications)
     MAIL_SERVER = os.environ.get('MAIL_SERVER')
     MAIL_PORT = int(os.environ.get('MAIL_PORT') or 587)
@@ -0,0 +1,59 @@
+from flask import current_app
+from sqlalchemy import event, select, func
+from app import db
+from app.models import Job, Application, JobMatch
+from app.utils import TTLCache
+
+RECENT_JOBS = 3
+
+# Site-wide figures shared by every dashboard view in this process
+_global_stats = None
+
+def _get_cache():
+    global _global_stats
+    if _global_stats is None:
+        _global_stats = TTLCache(maxsize=1, ttl=current_app.config['DASHBOARD_CACHE_TTL'])
+    return _global_stats
+
+def _count(model, *conditions):
+    return select(func.count()).select_from(model).where(*conditions).scalar_subquery()
+
+def user_counters(user_id):
+    """Per-user dashboard counts, all from one query (index-only counts)"""
+    row = db.session.execute(select(
+        _count(Application, Application.user_id == user_id).label('applications'),
+        _count(JobMatch, JobMatch.user_id == user_id).label('matches'),
+        _count(JobMatch, JobMatch.user_id == user_id, JobMatch.status == 'pending').label('pending'),
+        _count(Job, Job.posted_by == user_id).label('posted_jobs'),
+    )).one()
+    return row._asdict()
+
+def global_stats():
+    """Total jobs and the newest postings, cached for DASHBOARD_CACHE_TTL seconds"""
+    cache = _get_cache()
+    stats = cache.get('global')
+    if stats is None:
+        rows = db.session.execute(
+            select(Job.id, Job.title, Job.company, func.substr(Job.description, 1, 80).label('description'),
+                   (func.coalesce(Job.accessibility_features, '') != '').label('accessibility_features'))
+            .order_by(Job.created_at.desc(), Job.id.desc()).limit(RECENT_JOBS)
+        ).all()
+        stats = {
+            'total_jobs': db.session.execute(select(func.count(Job.id))).scalar(),
+            'recent_jobs': [row._asdict() for row in rows],
+        }
+        cache.put('global', stats)
+    return stats
+
+def invalidate_global_stats():
+    if _global_stats is not None:
+        _global_stats.clear()
+
+# Postings and removals show up immediately in this process; others wait out the TTL
+@event.listens_for(Job, 'after_insert')
+def _job_added(mapper, connection, job):
+    invalidate_global_stats()
+
+@event.listens_for(Job, 'after_delete')
+def _job_removed(mapper, connection, job):
+    invalidate_global_stats()
@@ -0,0 +1,106 @@
+from sqlalchemy import event, select
+from app import db
+from app.models import Job, JobFacet
+from app.search import filter_listing
+from app.utils import TTLCache
+
+# Facet name -> Job column shown as a filter dropdown
+FACET_COLUMNS = {
+    'location': Job.location,
+    'work_type': Job.work_type,
+}
+
+# Counts under active filters; cleared on local job writes, expire for other processes
+_filtered_counts = TTLCache(maxsize=500, ttl=60)
+
+def _facet_values(row):
+    return {name: row[name] for name in FACET_COLUMNS}
+
+def _adjust(connection, values, delta):
+    table = JobFacet.__table__
+    for facet, value in values.items():
+        if not value:
+            continue
+        match = (table.c.facet == facet) & (table.c.value == value)
+        updated = connection.execute(table.update().where(match)
+                                     .values(count=table.c.count + delta)).rowcount
+        if not updated and delta > 0:
+            connection.execute(table.insert().values(facet=facet, value=value, count=delta))
+        elif delta < 0:
+            connection.execute(table.delete().where(match & (table.c.count <= 0)))
+
+def _stored_values(connection, job_id):
+    # Values as currently in the database (the loaded object may be expired)
+    row = connection.execute(select(*FACET_COLUMNS.values()).where(Job.id == job_id)).first()
+    return _facet_values(row._mapping) if row else None
+
+def _counts_from_table():
+    counts = {name: [] for name in FACET_COLUMNS}
+    rows = JobFacet.query.filter(JobFacet.count > 0)\
+                         .order_by(JobFacet.facet, JobFacet.value).all()
+    for row in rows:
+        if row.facet in counts:
+            counts[row.facet].append((row.value, row.count))
+    return counts
+
+def _count_filtered(facet, filters):
+    # Disjunctive faceting: a facet's own selection does not narrow its counts
+    key = (facet,) + tuple(sorted((name, value) for name, value in filters.items()
+                                  if name != facet and value))
+    counts = _filtered_counts.get(key)
+    if counts is None:
+        column = FACET_COLUMNS[facet]
+        other_filters = {name: value for name, value in filters.items() if name != facet}
+        jobs_query, _ = filter_listing(Job.query, **other_filters)
+        counts = jobs_query.with_entities(column, db.func.count(Job.id))\
+                           .filter(column != None, column != '')\
+                           .group_by(column).order_by(column).all()
+        counts = [(value, count) for value, count in counts]
+        _filtered_counts.put(key, counts)
+    return counts
+
+def facet_counts(search_query='', location='', work_type=''):
+    """Dropdown values with job counts under the active listing filters"""
+    filters = {'search_query': search_query, 'location': location, 'work_type': work_type}
+    if not any(filters.values()):
+        return _counts_from_table()
+    return {facet: _count_filtered(facet, filters) for facet in FACET_COLUMNS}
+
+def rebuild_facets():
+    """Recount every facet from the job table; returns the number of values"""
+    db.session.query(JobFacet).delete()
+    rows = []
+    for facet, column in FACET_COLUMNS.items():
+        counts = db.session.query(column, db.func.count(Job.id))\
+                           .filter(column != None, column != '')\
+                           .group_by(column).all()
+        rows.extend({'facet': facet, 'value': value, 'count': count} for value, count in counts)
+    if rows:
+        db.session.execute(JobFacet.__table__.insert(), rows)
+    db.session.commit()
+    _filtered_counts.clear()
+    return len(rows)
+
+# Keep the stored counts in step with job writes, inside the same flush
+@event.listens_for(Job, 'after_insert')
+def _count_new_job(mapper, connection, job):
+    _adjust(connection, _facet_values({name: getattr(job, name) for name in FACET_COLUMNS}), 1)
+    _filtered_counts.clear()
+
+@event.listens_for(Job, 'before_update')
+def _recount_job(mapper, connection, job):
+    state = db.inspect(job)
+    if not any(state.attrs[name].history.has_changes() for name in FACET_COLUMNS):
+        return
+    old_values = _stored_values(connection, job.id)
+    if old_values:
+        _adjust(connection, old_values, -1)
+    _adjust(connection, _facet_values({name: getattr(job, name) for name in FACET_COLUMNS}), 1)
+    _filtered_counts.clear()
+
+@event.listens_for(Job, 'before_delete')
+def _uncount_job(mapper, connection, job):
+    old_values = _stored_values(connection, job.id)
+    if old_values:
+        _adjust(connection, old_values, -1)
+    _filtered_counts.clear()
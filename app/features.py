@@ -0,0 +1,127 @@
+import os
+import re
+import json
+
+# Experience buckets used by the profile and job forms
+EXPERIENCE_LEVELS = {
+    '0-1': 1, '1-3': 2, '3-5': 3, '5-10': 4, '10+': 5
+}
+
+# Stored masks are signed 64-bit integers
+ACCESSIBILITY_MASK_WIDTH = 63
+
+def load_accessibility_keywords(path=None):
+    """Load the keyword dictionary as [(name, phrases)], one entry per mask bit"""
+    path = path or os.environ.get('ACCESSIBILITY_KEYWORDS_FILE') or \
+        os.path.join(os.path.dirname(__file__), 'accessibility_keywords.json')
+    with open(path, encoding='utf-8') as keywords_file:
+        entries = json.load(keywords_file)['keywords']
+    if len(entries) > ACCESSIBILITY_MASK_WIDTH:
+        raise ValueError(f'At most {ACCESSIBILITY_MASK_WIDTH} accessibility keywords are supported')
+    return [(entry['name'], [phrase.lower() for phrase in entry.get('phrases', [entry['name']])])
+            for entry in entries]
+
+# Keywords that indicate good accessibility matches (bit i = entry i)
+ACCESSIBILITY_KEYWORDS = load_accessibility_keywords()
+
+def parse_skills(text):
+    """Split a comma separated skill string into lowercase skills"""
+    if not text:
+        return []
+    return [skill.strip().lower() for skill in text.split(',') if skill.strip()]
+
+def skill_tokens(text):
+    """Index tokens for a skill string: each skill plus its words"""
+    tokens = set()
+    for skill in parse_skills(text):
+        tokens.add(skill)
+        tokens.update(word for word in skill.split() if len(word) > 1)
+    return tokens
+
+def experience_level(value):
+    """Map an experience bucket to its level (0 if unknown)"""
+    if not value:
+        return 0
+    return EXPERIENCE_LEVELS.get(value, 0)
+
+def _scale_salary(number):
+    # Short numbers are written in thousands (e.g. "65" means 65,000)
+    return int(number) * (1000 if len(number) <= 3 else 1)
+
+def salary_bounds(text):
+    """Return (first, last) salary figures found in text, or None"""
+    if not text:
+        return None
+    numbers = re.findall(r'\d+', text.replace(',', ''))
+    if not numbers:
+        return None
+    return _scale_salary(numbers[0]), _scale_salary(numbers[-1])
+
+def location_tokens(text):
+    """Lowercase word set used for location comparison"""
+    if not text:
+        return set()
+    return set(text.lower().split())
+
+def is_remote(work_type):
+    """Whether a job's work type allows remote work"""
+    return bool(work_type) and 'remote' in work_type.lower()
+
+def accessibility_mask(text):
+    """Accessibility keywords found in text, as a bitmask (bit i = keyword i)"""
+    if not text:
+        return 0
+    text = text.lower()
+    mask = 0
+    for bit, (name, phrases) in enumerate(ACCESSIBILITY_KEYWORDS):
+        if any(phrase in text for phrase in phrases):
+            mask |= 1 << bit
+    return mask
+
+# Persisted feature columns, computed on write (see matching_engine)
+def user_feature_columns(user):
+    """Normalized matching features for a User row"""
+    salary = salary_bounds(user.salary_expectation)
+    return {
+        'skill_list': ','.join(parse_skills(user.skills)),
+        'experience_rank': experience_level(user.experience_level),
+        'salary_target': salary[0] if salary else None,
+        'location_terms': ' '.join(sorted(location_tokens(user.preferred_location))),
+        'accessibility_mask': accessibility_mask(user.accessibility_needs)
+    }
+
+def job_feature_columns(job):
+    """Normalized matching features for a Job row"""
+    salary = salary_bounds(job.salary_range)
+    return {
+        'skill_list': ','.join(parse_skills(job.required_skills)),
+        'experience_rank': experience_level(job.experience_required),
+        'salary_min': salary[0] if salary else None,
+        'salary_max': salary[1] if salary else None,
+        'location_terms': ' '.join(sorted(location_tokens(job.location))),
+        'remote': is_remote(job.work_type),
+        'accessibility_mask': accessibility_mask(job.accessibility_features)
+    }
+
+USER_FEATURE_COLUMNS = ('skill_list', 'experience_rank', 'salary_target',
+                        'location_terms', 'accessibility_mask')
+JOB_FEATURE_COLUMNS = ('skill_list', 'experience_rank', 'salary_min', 'salary_max',
+                       'location_terms', 'remote', 'accessibility_mask')
+
+def _stored(obj, columns, builder):
+    # Rows not backfilled yet (or plain objects) fall back to parsing
+    if getattr(obj, 'experience_rank', None) is None:
+        return builder(obj)
+    return {name: getattr(obj, name) for name in columns}
+
+def stored_user_features(user):
+    """Persisted feature columns of a user, computed on the fly if missing"""
+    return _stored(user, USER_FEATURE_COLUMNS, user_feature_columns)
+
+def stored_job_features(job):
+    """Persisted feature columns of a job, computed on the fly if missing"""
+    return _stored(job, JOB_FEATURE_COLUMNS, job_feature_columns)
+
+def split_terms(text, separator):
+    """Inverse of the joins used for persisted list columns"""
+    return text.split(separator) if text else []
@@ -74,6 +74,32 @@ class JobForm(FlaskForm):
     location = StringField('Location',
                           render_kw={'class': 'form-control form-control-lg'})
     
+    required_skills = StringField('Required Skills (comma separated)',
+                                 validators=[Optional()],
+                                 render_kw={'class': 'form-control form-control-lg'})
+    
+    experience_required = SelectField('Experience Required',
+                                     choices=[
+                                         ('', 'Not specified'),
+                                         ('0-1', '0-1 years'),
+                                         ('1-3', '1-3 years'),
+                                         ('3-5', '3-5 years'),
+                                         ('5-10', '5-10 years'),
+                                         ('10+', '10+ years')
+                                     ],
+                                     validators=[Optional()],
+                                     render_kw={'class': 'form-select form-select-lg'})
+    
+    work_type = SelectField('Work Type',
+                           choices=[
+                               ('', 'Not specified'),
+                               ('remote', 'Remote'),
+                               ('hybrid', 'Hybrid'),
+                               ('onsite', 'On-site')
+                           ],
+                           validators=[Optional()],
+                           render_kw={'class': 'form-select form-select-lg'})
+    
     submit = SubmitField('Post Job', render_kw={'class': 'btn btn-success btn-lg'})
 
 class ApplicationForm(FlaskForm):
@@ -1,249 +1,342 @@
-import re
 import json
+import heapq
+from collections import defaultdict
 from datetime import datetime
-from app.models import User, Job, JobMatch
+from flask import current_app
+from app.models import User, Job, Application, JobMatch
+from app.features import accessibility_mask, user_feature_columns, job_feature_columns
+from app import batch_matching
+from app.skill_index import candidate_jobs, candidate_seekers
+from app.utils import batched
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
 from app import db
 
+# Minimum overall score for a job to be stored as a match
+MATCH_THRESHOLD = 30.0
+
+# IDs per IN (...) list, well under SQLite's bound-parameter limit (999 before 3.32)
+IN_BATCH_SIZE = 500
+
+# Profile and job fields that feed the match score
+USER_MATCH_FIELDS = ('skills', 'experience_level', 'preferred_location', 'salary_expectation',
+                     'disability_type', 'accessibility_needs')
+JOB_MATCH_FIELDS = ('required_skills', 'experience_required', 'location', 'work_type',
+                    'accessibility_features', 'salary_range')
+
 class JobMatchingEngine:
     
+    # Single scoring implementation shared by every match path
+    scorer = batch_matching.ScoringEngine()
+    
     @staticmethod
-    def calculate_skills_match(user_skills, job_skills):
-        """Calculate skills compatibility (0-100)"""
-        if not user_skills or not job_skills:
-            return 0.0
-            
-        user_skills_list = [skill.strip().lower() for skill in user_skills.split(',') if skill.strip()]
-        job_skills_list = [skill.strip().lower() for skill in job_skills.split(',') if skill.strip()]
-        
-        if not user_skills_list or not job_skills_list:
-            return 0.0
-            
-        # Find matching skills
-        matching_skills = set(user_skills_list) & set(job_skills_list)
-        
-        # Also check for partial matches (e.g., "python" matches "python programming")
-        partial_matches = 0
-        for user_skill in user_skills_list:
-            for job_skill in job_skills_list:
-                if user_skill in job_skill or job_skill in user_skill:
-                    partial_matches += 0.5
-                    break
-        
-        # Calculate match percentage
-        total_required_skills = len(job_skills_list)
-        match_score = ((len(matching_skills) + partial_matches) / total_required_skills) * 100
-        
-        return min(100.0, match_score)
+    def score_jobs_for_user(user, jobs):
+        """Batch score one user against many jobs (arrays aligned with jobs)"""
+        return JobMatchingEngine.scorer.score_jobs(user, jobs)
     
     @staticmethod
-    def calculate_experience_match(user_experience, job_experience):
-        """Calculate experience level match (0-100)"""
-        if not user_experience or not job_experience:
-            return 50.0  # Neutral if not specified
-            
-        experience_levels = {
-            '0-1': 1, '1-3': 2, '3-5': 3, '5-10': 4, '10+': 5
+    def score_users_for_job(users, job):
+        """Batch score many users against one job (arrays aligned with users)"""
+        return JobMatchingEngine.scorer.score_users(users, job)
+    
+    @staticmethod
+    def batch_match_details(scores, index):
+        """Overall score and details for one row of a batch result"""
+        match_details = {
+            key: round(float(scores[key][index]), 1)
+            for key in ('skills_match', 'experience_match', 'location_match',
+                        'accessibility_match', 'salary_match')
         }
-        
-        user_level = experience_levels.get(user_experience, 0)
-        job_level = experience_levels.get(job_experience, 0)
-        
-        if user_level == 0 or job_level == 0:
-            return 50.0
-            
-        # Exact match = 100%, 1 level difference = 80%, 2 levels = 60%, etc.
-        difference = abs(user_level - job_level)
-        if difference == 0:
-            return 100.0
-        elif difference == 1:
-            return 80.0
-        elif difference == 2:
-            return 60.0
-        else:
-            return 40.0
+        match_details['calculated_at'] = datetime.utcnow().isoformat()
+        return round(float(scores['overall'][index]), 1), match_details
     
     @staticmethod
-    def calculate_location_match(user_location, job_location, work_type):
-        """Calculate location compatibility (0-100)"""
-        if not job_location:
-            return 100.0  # No location requirement
-            
-        if work_type and 'remote' in work_type.lower():
-            return 100.0  # Remote work = location doesn't matter
-            
-        if not user_location:
-            return 50.0  # User hasn't specified location
-            
-        # Simple keyword matching for cities/states
-        user_location_words = set(user_location.lower().split())
-        job_location_words = set(job_location.lower().split())
+    def excluded_job_ids(user_id):
+        """IDs of jobs the user already applied to or was matched with (one query)"""
+        applied = db.session.query(Application.job_id).filter(Application.user_id == user_id)
+        matched = db.session.query(JobMatch.job_id).filter(JobMatch.user_id == user_id)
+        return {job_id for (job_id,) in applied.union(matched)}
+    
+    @staticmethod
+    def bulk_insert_matches(rows):
+        """Insert JobMatch rows (list of column dicts) in one executemany.
         
-        common_words = user_location_words & job_location_words
-        if common_words:
-            return 100.0
+        Pairs that already have a match (e.g. written by a concurrent task)
+        are skipped instead of failing on the (user_id, job_id) unique index.
+        """
+        if not rows:
+            return 0
+        dialect = db.engine.dialect.name
+        if dialect == 'sqlite':
+            statement = sqlite_insert(JobMatch.__table__).on_conflict_do_nothing(
+                index_elements=['user_id', 'job_id'])
+        elif dialect == 'postgresql':
+            statement = postgresql_insert(JobMatch.__table__).on_conflict_do_nothing(
+                index_elements=['user_id', 'job_id'])
         else:
-            return 20.0  # Different locations
+            statement = JobMatch.__table__.insert()
+        result = db.session.execute(statement, rows)
+        return result.rowcount if result.rowcount >= 0 else len(rows)
     
     @staticmethod
-    def calculate_accessibility_match(user_disability, user_needs, job_features):
-        """Calculate accessibility compatibility (0-100)"""
-        if not user_disability and not user_needs:
-            return 100.0  # No accessibility requirements
-            
-        if not job_features:
-            return 20.0  # Job doesn't specify accessibility features
-            
-        # Check if job features match user needs
-        user_needs_lower = (user_needs or '').lower()
-        job_features_lower = job_features.lower()
-        
-        # Keywords that indicate good accessibility matches
-        accessibility_keywords = [
-            'wheelchair', 'accessible', 'screen reader', 'braille', 'hearing',
-            'visual', 'cognitive', 'mobility', 'remote', 'flexible', 'accommodation'
-        ]
-        
-        matches = 0
-        for keyword in accessibility_keywords:
-            if keyword in user_needs_lower and keyword in job_features_lower:
-                matches += 1
-        
-        # Base score for PWD-friendly jobs
-        base_score = 60.0
-        keyword_bonus = min(40.0, matches * 10)
-        
-        return base_score + keyword_bonus
+    def match_row(user_id, job_id, overall_score, match_details):
+        """Column dict for a JobMatch insert"""
+        return {
+            'user_id': user_id,
+            'job_id': job_id,
+            'match_score': overall_score,
+            'skills_match': match_details['skills_match'],
+            'experience_match': match_details['experience_match'],
+            'location_match': match_details['location_match'],
+            'accessibility_match': match_details['accessibility_match'],
+            'salary_match': match_details['salary_match'],
+            'match_details': json.dumps(match_details)
+        }
     
     @staticmethod
-    def calculate_salary_match(user_expectation, job_range):
-        """Calculate salary compatibility (0-100)"""
-        if not user_expectation or not job_range:
-            return 75.0  # Neutral if not specified
-            
-        try:
-            # Extract numbers from salary strings
-            user_numbers = re.findall(r'\d+', user_expectation.replace(',', ''))
-            job_numbers = re.findall(r'\d+', job_range.replace(',', ''))
-            
-            if not user_numbers or not job_numbers:
-                return 75.0
-                
-            user_salary = int(user_numbers[0]) * (1000 if len(user_numbers[0]) <= 3 else 1)
-            job_min = int(job_numbers[0]) * (1000 if len(job_numbers[0]) <= 3 else 1)
-            job_max = int(job_numbers[-1]) * (1000 if len(job_numbers[-1]) <= 3 else 1)
-            
-            if job_min <= user_salary <= job_max:
-                return 100.0  # Perfect match
-            elif user_salary < job_min:
-                # User expects less than offered
-                return 90.0
-            else:
-                # User expects more than offered
-                difference_percent = ((user_salary - job_max) / job_max) * 100
-                return max(20.0, 80.0 - difference_percent)
-                
-        except (ValueError, IndexError):
-            return 75.0
-    
-    @staticmethod
-    def calculate_overall_match(user, job):
-        """Calculate overall match score and details"""
+    def top_k():
+        """Max pending matches kept per seeker (0 = unlimited)"""
+        return current_app.config.get('MATCH_TOP_K') or 0
+    
+    @staticmethod
+    def _best_rows(rows, limit):
+        # Bounded heap: keep only the `limit` best-scoring rows
+        if limit and len(rows) > limit:
+            return heapq.nlargest(limit, rows, key=lambda row: row['match_score'])
+        return rows
+    
+    @staticmethod
+    def generate_matches_for_user(user_id):
+        """Fill a seeker's pending queue up to top-K; returns {'created', 'more'}"""
+        user = User.query.get(user_id)
+        if not user or user.user_type != 'job_seeker':
+            return {'created': 0, 'more': False}
         
-        # Calculate individual match scores
-        skills_match = JobMatchingEngine.calculate_skills_match(
-            user.skills, job.required_skills
-        )
+        # Only jobs sharing at least one skill with the user are scored,
+        # skipping jobs already applied to or matched
+        excluded = JobMatchingEngine.excluded_job_ids(user.id)
+        candidates = [job for job in candidate_jobs(user.skills).all()
+                      if job.id not in excluded]
         
-        experience_match = JobMatchingEngine.calculate_experience_match(
-            user.experience_level, job.experience_required
-        )
+        # Score all remaining jobs in one vectorized pass
+        scores = JobMatchingEngine.score_jobs_for_user(user, candidates)
+        rows = []
         
-        location_match = JobMatchingEngine.calculate_location_match(
-            user.preferred_location, job.location, job.work_type
-        )
+        for index, job in enumerate(candidates):
+            overall_score, match_details = JobMatchingEngine.batch_match_details(scores, index)
+            
+            # Only create matches above threshold (e.g., 30%)
+            if overall_score >= MATCH_THRESHOLD:
+                rows.append(JobMatchingEngine.match_row(user.id, job.id, overall_score, match_details))
         
-        accessibility_match = JobMatchingEngine.calculate_accessibility_match(
-            user.disability_type, user.accessibility_needs, job.accessibility_features
-        )
+        # Only the free slots in the pending queue are filled
+        limit = JobMatchingEngine.top_k()
+        if limit:
+            pending = JobMatch.query.filter_by(user_id=user.id, status='pending').count()
+            limit = max(limit - pending, 0)
+            best = JobMatchingEngine._best_rows(rows, limit) if limit else []
+        else:
+            best = rows
         
-        salary_match = JobMatchingEngine.calculate_salary_match(
-            user.salary_expectation, job.salary_range
-        )
+        created = JobMatchingEngine.bulk_insert_matches(best)
+        db.session.commit()
+        return {'created': created, 'more': len(best) < len(rows)}
+    
+    @staticmethod
+    def matching_fields_changed(obj):
+        """Whether pending (uncommitted) changes touch the match inputs of a User or Job"""
+        fields = USER_MATCH_FIELDS if isinstance(obj, User) else JOB_MATCH_FIELDS
+        attrs = db.inspect(obj).attrs
+        return any(attrs[field].history.has_changes() for field in fields)
+    
+    @staticmethod
+    def _write_match_deltas(keys, scores, existing):
+        """Insert, update and delete JobMatch rows for scored (user_id, job_id) keys.
         
-        # Weighted overall score
-        weights = {
-            'skills': 0.35,
-            'experience': 0.25,
-            'accessibility': 0.20,
-            'location': 0.10,
-            'salary': 0.10
-        }
+        existing maps every in-scope (user_id, job_id) to its (match id, status).
+        Pending matches that fall below the threshold or are no longer candidates
+        are removed; liked/passed/applied matches keep their status and only get
+        fresh scores.
+        """
+        inserts, updates = [], []
+        kept = set()
         
-        overall_score = (
-            skills_match * weights['skills'] +
-            experience_match * weights['experience'] +
-            accessibility_match * weights['accessibility'] +
-            location_match * weights['location'] +
-            salary_match * weights['salary']
-        )
+        for index, (user_id, job_id) in enumerate(keys):
+            overall_score, match_details = JobMatchingEngine.batch_match_details(scores, index)
+            current = existing.get((user_id, job_id))
+            if current and (overall_score >= MATCH_THRESHOLD or current[1] != 'pending'):
+                row = JobMatchingEngine.match_row(user_id, job_id, overall_score, match_details)
+                row['id'] = current[0]
+                updates.append(row)
+                kept.add((user_id, job_id))
+            elif not current and overall_score >= MATCH_THRESHOLD:
+                inserts.append(JobMatchingEngine.match_row(user_id, job_id, overall_score, match_details))
         
-        # Match details
-        match_details = {
-            'skills_match': round(skills_match, 1),
-            'experience_match': round(experience_match, 1),
-            'location_match': round(location_match, 1),
-            'accessibility_match': round(accessibility_match, 1),
-            'salary_match': round(salary_match, 1),
-            'calculated_at': datetime.utcnow().isoformat()
-        }
+        stale = [match_id for key, (match_id, status) in existing.items()
+                 if key not in kept and status == 'pending']
         
-        return round(overall_score, 1), match_details
+        # Top-K: each seeker gets at most K new rows before the queue is trimmed
+        limit = JobMatchingEngine.top_k()
+        candidate_count = len(inserts)
+        if limit:
+            inserts_by_user = defaultdict(list)
+            for row in inserts:
+                inserts_by_user[row['user_id']].append(row)
+            inserts = [row for user_rows in inserts_by_user.values()
+                       for row in JobMatchingEngine._best_rows(user_rows, limit)]
+        
+        for ids in batched(stale, IN_BATCH_SIZE):
+            JobMatch.query.filter(JobMatch.id.in_(ids)).delete(synchronize_session=False)
+        if updates:
+            db.session.bulk_update_mappings(JobMatch, updates)
+        JobMatchingEngine.bulk_insert_matches(inserts)
+        trimmed = JobMatchingEngine.trim_pending({user_id for user_id, job_id in keys}, limit)
+        return {'inserted': len(inserts), 'updated': len(updates), 'deleted': len(stale) + trimmed,
+                'more': trimmed > 0 or len(inserts) < candidate_count}
     
     @staticmethod
-    def generate_matches_for_user(user_id):
-        """Generate job matches for a specific user"""
+    def trim_pending(user_ids, limit):
+        """Delete pending matches beyond each seeker's K best; returns rows deleted"""
+        if not limit or not user_ids:
+            return 0
+        extra = []
+        for batch in batched(sorted(user_ids), IN_BATCH_SIZE):
+            rows = db.session.query(JobMatch.id, JobMatch.user_id).filter(
+                JobMatch.user_id.in_(batch), JobMatch.status == 'pending'
+            ).order_by(JobMatch.user_id, JobMatch.match_score.desc(), JobMatch.id).all()
+            
+            seen = defaultdict(int)
+            for match_id, user_id in rows:
+                seen[user_id] += 1
+                if seen[user_id] > limit:
+                    extra.append(match_id)
+        for ids in batched(extra, IN_BATCH_SIZE):
+            JobMatch.query.filter(JobMatch.id.in_(ids)).delete(synchronize_session=False)
+        return len(extra)
+    
+    @staticmethod
+    def rematch_user(user_id):
+        """Rescore one seeker against their candidate jobs and write the delta"""
         user = User.query.get(user_id)
         if not user or user.user_type != 'job_seeker':
-            return []
+            return None
         
-        # Get all available jobs
-        jobs = Job.query.all()
-        matches = []
+        applied = {job_id for (job_id,) in
+                   db.session.query(Application.job_id).filter(Application.user_id == user.id)}
+        jobs = [job for job in candidate_jobs(user.skills).all() if job.id not in applied]
+        existing = {
+            (user.id, job_id): (match_id, status)
+            for match_id, job_id, status in db.session.query(
+                JobMatch.id, JobMatch.job_id, JobMatch.status
+            ).filter(JobMatch.user_id == user.id)
+        }
         
-        for job in jobs:
-            # Skip if user already applied to this job
-            existing_application = Application.query.filter_by(
-                user_id=user.id, job_id=job.id
-            ).first()
-            if existing_application:
-                continue
-                
-            # Skip if match already exists
-            existing_match = JobMatch.query.filter_by(
-                user_id=user.id, job_id=job.id
-            ).first()
-            if existing_match:
-                continue
-            
-            # Calculate match
-            overall_score, match_details = JobMatchingEngine.calculate_overall_match(user, job)
-            
-            # Only create matches above threshold (e.g., 30%)
-            if overall_score >= 30.0:
-                job_match = JobMatch(
-                    user_id=user.id,
-                    job_id=job.id,
-                    match_score=overall_score,
-                    skills_match=match_details['skills_match'],
-                    experience_match=match_details['experience_match'],
-                    location_match=match_details['location_match'],
-                    accessibility_match=match_details['accessibility_match'],
-                    salary_match=match_details['salary_match'],
-                    match_details=json.dumps(match_details)
-                )
-                
-                db.session.add(job_match)
-                matches.append(job_match)
+        scores = JobMatchingEngine.score_jobs_for_user(user, jobs)
+        keys = [(user.id, job.id) for job in jobs]
+        delta = JobMatchingEngine._write_match_deltas(keys, scores, existing)
+        db.session.commit()
+        return delta
+    
+    @staticmethod
+    def rematch_job(job_id):
+        """Score a new or edited job against its candidate seekers and write the delta"""
+        job = Job.query.get(job_id)
+        if not job:
+            return None
+        
+        applied = {user_id for (user_id,) in
+                   db.session.query(Application.user_id).filter(Application.job_id == job.id)}
+        seekers = [user for user in candidate_seekers(job.required_skills).all()
+                   if user.id not in applied]
+        existing = {
+            (user_id, job.id): (match_id, status)
+            for match_id, user_id, status in db.session.query(
+                JobMatch.id, JobMatch.user_id, JobMatch.status
+            ).filter(JobMatch.job_id == job.id)
+        }
         
+        scores = JobMatchingEngine.score_users_for_job(seekers, job)
+        keys = [(user.id, job.id) for user in seekers]
+        delta = JobMatchingEngine._write_match_deltas(keys, scores, existing)
         db.session.commit()
-        return matches
+        return delta
+
+    @staticmethod
+    def backfill_features(batch_size=500):
+        """Compute persisted feature columns for rows that predate them"""
+        updated = 0
+        for model, builder in ((User, user_feature_columns), (Job, job_feature_columns)):
+            last_id = 0
+            while True:
+                rows = model.query.filter(model.id > last_id, model.experience_rank == None)\
+                                  .order_by(model.id).limit(batch_size).all()
+                if not rows:
+                    break
+                db.session.bulk_update_mappings(model, [dict(builder(row), id=row.id) for row in rows])
+                db.session.commit()
+                updated += len(rows)
+                last_id = rows[-1].id
+        return updated
+    
+    @staticmethod
+    def recompute_accessibility_masks(batch_size=500):
+        """Re-encode stored masks after the keyword dictionary changed"""
+        updated = 0
+        sources = (
+            (User, User.accessibility_needs, User.profile_version, 'profile_version'),
+            (Job, Job.accessibility_features, Job.version, 'version'),
+        )
+        for model, text_column, version_column, version_name in sources:
+            last_id = 0
+            while True:
+                rows = db.session.query(model.id, text_column, model.accessibility_mask, version_column)\
+                                 .filter(model.id > last_id).order_by(model.id).limit(batch_size).all()
+                if not rows:
+                    break
+                # Version bumps keep memoized scores from using the old masks;
+                # incremented in SQL like the write-time bumps
+                changes = [
+                    {'row_id': row_id, 'new_mask': accessibility_mask(text)}
+                    for row_id, text, mask, version in rows
+                    if accessibility_mask(text) != (mask or 0)
+                ]
+                if changes:
+                    db.session.execute(
+                        model.__table__.update()
+                        .where(model.id == db.bindparam('row_id'))
+                        .values({'accessibility_mask': db.bindparam('new_mask'),
+                                 version_name: db.func.coalesce(version_column, 1) + 1}),
+                        changes
+                    )
+                    db.session.commit()
+                updated += len(changes)
+                last_id = rows[-1][0]
+        return updated
+
+def _apply_features(obj, columns):
+    for name, value in columns.items():
+        setattr(obj, name, value)
+
+# Features are computed once on write; version bumps invalidate memoized scores
+@event.listens_for(User, 'before_insert')
+def _init_user_features(mapper, connection, user):
+    _apply_features(user, user_feature_columns(user))
+
+@event.listens_for(Job, 'before_insert')
+def _init_job_features(mapper, connection, job):
+    _apply_features(job, job_feature_columns(job))
+
+# Versions are incremented in the UPDATE itself, never from the value this
+# process loaded, so two concurrent saves can not end on the same version
+@event.listens_for(User, 'before_update')
+def _refresh_user_features(mapper, connection, user):
+    if JobMatchingEngine.matching_fields_changed(user):
+        user.profile_version = db.func.coalesce(User.profile_version, 1) + 1
+        _apply_features(user, user_feature_columns(user))
+
+@event.listens_for(Job, 'before_update')
+def _refresh_job_features(mapper, connection, job):
+    if JobMatchingEngine.matching_fields_changed(job):
+        job.version = db.func.coalesce(Job.version, 1) + 1
+        _apply_features(job, job_feature_columns(job))
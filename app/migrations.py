@@ -0,0 +1,272 @@
+import json
+from contextlib import contextmanager
+from datetime import datetime
+from sqlalchemy import inspect, literal, text, Table, Column, String, DateTime, MetaData
+from app import db
+
+# Applied revisions, one row each
+schema_migrations = Table(
+    'schema_migrations', MetaData(),
+    Column('version', String(50), primary_key=True),
+    Column('applied_at', DateTime, nullable=False),
+)
+
+# Arbitrary key for the PostgreSQL advisory lock serializing concurrent runners
+ADVISORY_LOCK_KEY = 72610016
+
+class Migration:
+    """One schema revision.
+
+    Transactional revisions get a connection and run inside a single
+    transaction together with their schema_migrations row. Batched
+    revisions (online backfills) commit per batch through the session, so
+    they never hold long locks; they must be safe to re-run if interrupted.
+    """
+
+    def __init__(self, version, description, upgrade, transactional=True):
+        self.version = version
+        self.description = description
+        self.upgrade = upgrade
+        self.transactional = transactional
+
+# --- DDL helpers (idempotent, portable between SQLite and PostgreSQL) ---
+
+def _quote(connection, name):
+    return connection.dialect.identifier_preparer.quote(name)
+
+def has_column(connection, table_name, column_name):
+    return any(column['name'] == column_name
+               for column in inspect(connection).get_columns(table_name))
+
+def add_column(connection, table_name, column_name, column_type, default=None):
+    """ALTER TABLE ... ADD COLUMN unless the column already exists"""
+    if has_column(connection, table_name, column_name):
+        return False
+    dialect = connection.dialect
+    statement = (f"ALTER TABLE {_quote(connection, table_name)} "
+                 f"ADD COLUMN {_quote(connection, column_name)} {column_type.compile(dialect=dialect)}")
+    if default is not None:
+        statement += " DEFAULT " + str(literal(default, column_type).compile(
+            dialect=dialect, compile_kwargs={'literal_binds': True}))
+    connection.execute(text(statement))
+    return True
+
+def create_model_indexes(connection, model, *names):
+    """Create the named indexes declared on model that do not exist yet.
+
+    Revisions list their indexes by name: an index added to the model later
+    may need columns that only a later revision creates.
+    """
+    indexes = {index.name: index for index in model.__table__.indexes}
+    for name in names:
+        indexes[name].create(connection, checkfirst=True)
+
+# --- Revisions ---
+
+def _create_missing_tables(connection):
+    # Tables created here already have every column and index of the models;
+    # the revisions below only touch databases that predate them
+    db.metadata.create_all(connection)
+
+def _matching_profile_columns(connection):
+    from app.models import User, Job
+    for model, names in ((User, ('skills', 'experience_level', 'preferred_location',
+                                 'salary_expectation', 'accessibility_needs', 'work_preferences')),
+                         (Job, ('required_skills', 'experience_required', 'work_type'))):
+        for name in names:
+            add_column(connection, model.__tablename__, name, model.__table__.c[name].type)
+    add_column(connection, 'job', 'disability_friendly', Job.__table__.c.disability_friendly.type, True)
+
+def _feature_columns(connection):
+    from app.models import User, Job, MatchTask
+    from app.features import USER_FEATURE_COLUMNS, JOB_FEATURE_COLUMNS
+    add_column(connection, 'user', 'profile_version', User.__table__.c.profile_version.type, 1)
+    add_column(connection, 'job', 'version', Job.__table__.c.version.type, 1)
+    for model, names in ((User, USER_FEATURE_COLUMNS), (Job, JOB_FEATURE_COLUMNS)):
+        for name in names:
+            column = model.__table__.c[name]
+            default = column.default.arg if column.default is not None else None
+            add_column(connection, model.__tablename__, name, column.type, default)
+    add_column(connection, 'match_task', 'result', MatchTask.__table__.c.result.type)
+
+def _dedupe_and_lookup_indexes(connection):
+    from app.models import Job, Application, JobMatch
+    # Unique indexes need duplicate rows gone: keep the first application,
+    # and the match a seeker acted on (liked/passed/applied), else the newest
+    connection.execute(text('''
+        DELETE FROM application WHERE id NOT IN (
+            SELECT MIN(id) FROM application GROUP BY user_id, job_id
+        )
+    '''))
+    connection.execute(text('''
+        DELETE FROM job_match WHERE id NOT IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY user_id, job_id ORDER BY status = 'pending', id DESC
+                ) AS position FROM job_match
+            ) AS ranked WHERE position = 1
+        )
+    '''))
+    create_model_indexes(connection, Job, 'ix_job_created_at_id', 'ix_job_posted_by')
+    create_model_indexes(connection, Application, 'uq_application_user_job', 'ix_application_job_id')
+    create_model_indexes(connection, JobMatch, 'uq_job_match_user_job', 'ix_job_match_user_status_score',
+                         'ix_job_match_job_id')
+
+def _job_search_index(connection):
+    from app.search import install_search_index
+    install_search_index(connection)
+
+def _backfill_derived_data(batch_size):
+    from app.models import JobMatch
+    from app.matching_engine import JobMatchingEngine
+    from app.skill_index import rebuild_skill_index
+    from app.facets import rebuild_facets
+
+    backfilled = JobMatchingEngine.backfill_features(batch_size)
+    print(f"   computed matching features for {backfilled} users and jobs")
+    remasked = JobMatchingEngine.recompute_accessibility_masks(batch_size)
+    print(f"   re-encoded accessibility keywords for {remasked} users and jobs")
+    indexed_jobs, indexed_users = rebuild_skill_index(batch_size)
+    print(f"   indexed skills for {indexed_jobs} jobs and {indexed_users} users")
+    facet_values = rebuild_facets()
+    print(f"   counted {facet_values} location and work type filter values")
+
+    # Rescore matches stored by the old route scorer (fake component fractions)
+    legacy_users = db.session.query(JobMatch.user_id).filter(
+        JobMatch.match_details == json.dumps({'generated': True})
+    ).distinct().all()
+    for (user_id,) in legacy_users:
+        JobMatchingEngine.rematch_user(user_id)
+    print(f"   rescored legacy matches for {len(legacy_users)} users")
+
+def _job_similarity(batch_size):
+    from app.models import JobSimilarity
+    from app.similarity import rebuild_similarities
+    with db.engine.begin() as connection:
+        JobSimilarity.__table__.create(connection, checkfirst=True)
+    computed = rebuild_similarities(batch_size)
+    print(f"   computed similar jobs for {computed} jobs")
+
+def _certificate_storage(connection):
+    from app.models import Application, StoredFile
+    StoredFile.__table__.create(connection, checkfirst=True)
+    for name in ('certificate_sha256', 'certificate_name'):
+        add_column(connection, 'application', name, Application.__table__.c[name].type)
+    create_model_indexes(connection, Application, 'ix_application_certificate_sha256')
+
+def _import_legacy_certificates(batch_size):
+    from app.storage import import_legacy_certificates
+    imported, missing = import_legacy_certificates(batch_size)
+    print(f"   moved {imported} certificates into the content store ({missing} files missing)")
+
+def _certificate_check_columns(connection):
+    from app.models import StoredFile
+    for name in ('check_status', 'check_error', 'page_count', 'pdf_metadata', 'has_preview', 'checked_at'):
+        column = StoredFile.__table__.c[name]
+        default = column.default.arg if column.default is not None else None
+        add_column(connection, 'stored_file', name, column.type, default)
+
+def _check_stored_certificates(batch_size):
+    from app.certificate_check import check_pending_certificates
+    checked = check_pending_certificates(batch_size)
+    print(f"   checked {checked} stored certificates")
+
+def _stored_file_modes(batch_size):
+    from app.storage import repair_file_modes
+    print(f"   made {repair_file_modes()} stored files readable by the web server")
+
+MIGRATIONS = [
+    Migration('0001_create_missing_tables', 'Create tables missing from the database',
+              _create_missing_tables),
+    Migration('0002_matching_profile_columns', 'Profile and job fields used for matching',
+              _matching_profile_columns),
+    Migration('0003_feature_columns', 'Version counters, stored matching features, task results',
+              _feature_columns),
+    Migration('0004_lookup_indexes', 'Deduplicate matches/applications, add lookup indexes',
+              _dedupe_and_lookup_indexes),
+    Migration('0005_job_search_index', 'Full-text job search index', _job_search_index),
+    Migration('0006_backfill_derived_data', 'Backfill features, skill index, facets and legacy scores',
+              _backfill_derived_data, transactional=False),
+    Migration('0007_job_similarity', 'Precomputed similar jobs table', _job_similarity,
+              transactional=False),
+    Migration('0008_certificate_storage', 'Content-addressed certificate files',
+              _certificate_storage),
+    Migration('0009_import_legacy_certificates', 'Move uploaded certificates into the content store',
+              _import_legacy_certificates, transactional=False),
+    Migration('0010_certificate_check_columns', 'PDF check status, page count, metadata, preview',
+              _certificate_check_columns),
+    Migration('0011_check_stored_certificates', 'Check certificates stored before the PDF pipeline',
+              _check_stored_certificates, transactional=False),
+    Migration('0012_stored_file_modes', 'Default permissions for stored certificates and previews',
+              _stored_file_modes, transactional=False),
+]
+
+# --- Runner ---
+
+def _ensure_version_table():
+    with db.engine.begin() as connection:
+        schema_migrations.create(connection, checkfirst=True)
+
+def applied_versions():
+    """Versions recorded in schema_migrations"""
+    _ensure_version_table()
+    with db.engine.connect() as connection:
+        return {row.version for row in connection.execute(schema_migrations.select())}
+
+def pending_migrations():
+    applied = applied_versions()
+    return [migration for migration in MIGRATIONS if migration.version not in applied]
+
+def _record(connection, migration):
+    connection.execute(schema_migrations.insert().values(
+        version=migration.version, applied_at=datetime.utcnow()))
+
+@contextmanager
+def _revision_transaction():
+    """Connection in one transaction that also covers DDL.
+
+    pysqlite only opens transactions before DML and autocommits ALTER TABLE
+    and CREATE INDEX; with its own transaction handling switched off and an
+    explicit BEGIN, a failing SQLite revision leaves no schema changes behind.
+    """
+    with db.engine.connect() as connection:
+        if connection.dialect.name != 'sqlite':
+            with connection.begin():
+                yield connection
+            return
+        driver_connection = connection.connection.driver_connection
+        isolation_level = driver_connection.isolation_level
+        driver_connection.isolation_level = None
+        try:
+            with connection.begin():
+                connection.exec_driver_sql('BEGIN')
+                yield connection
+        finally:
+            # Back to the driver's default before the connection returns to the pool
+            driver_connection.isolation_level = isolation_level
+
+def upgrade(batch_size=500):
+    """Apply pending revisions in order; returns the versions applied"""
+    _ensure_version_table()
+    postgresql = db.engine.dialect.name == 'postgresql'
+    with db.engine.connect() as lock_connection:
+        if postgresql:
+            lock_connection.execute(text('SELECT pg_advisory_lock(:key)'), {'key': ADVISORY_LOCK_KEY})
+        try:
+            applied = []
+            for migration in pending_migrations():
+                print(f"➡️  {migration.version}: {migration.description}")
+                if migration.transactional:
+                    with _revision_transaction() as connection:
+                        migration.upgrade(connection)
+                        _record(connection, migration)
+                else:
+                    migration.upgrade(batch_size)
+                    with db.engine.begin() as connection:
+                        _record(connection, migration)
+                applied.append(migration.version)
+            return applied
+        finally:
+            if postgresql:
+                lock_connection.execute(text('SELECT pg_advisory_unlock(:key)'), {'key': ADVISORY_LOCK_KEY})
+                lock_connection.commit()
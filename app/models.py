@@ -20,6 +20,14 @@ class User(UserMixin, db.Model):
     salary_expectation = db.Column(db.String(100))
     accessibility_needs = db.Column(db.Text)
     work_preferences = db.Column(db.Text)
+    profile_version = db.Column(db.Integer, default=1)  # Bumped when match inputs change
+
+    # Normalized matching features, computed on write
+    skill_list = db.Column(db.Text)
+    experience_rank = db.Column(db.Integer)
+    salary_target = db.Column(db.BigInteger)
+    location_terms = db.Column(db.Text)
+    accessibility_mask = db.Column(db.BigInteger, default=0)
 
     # Relationships
     applications = db.relationship('Application', backref='applicant', lazy=True)
@@ -43,11 +51,26 @@ class Job(db.Model):
     experience_required = db.Column(db.String(50))
     work_type = db.Column(db.String(50))
     disability_friendly = db.Column(db.Boolean, default=True)
+    version = db.Column(db.Integer, default=1)  # Bumped when match inputs change
+
+    # Normalized matching features, computed on write
+    skill_list = db.Column(db.Text)
+    experience_rank = db.Column(db.Integer)
+    salary_min = db.Column(db.BigInteger)
+    salary_max = db.Column(db.BigInteger)
+    location_terms = db.Column(db.Text)
+    remote = db.Column(db.Boolean, default=False)
+    accessibility_mask = db.Column(db.BigInteger, default=0)
 
     # Relationships
     applications = db.relationship('Application', backref='job', lazy=True)
     matches = db.relationship('JobMatch', backref='job', lazy=True)
 
+    __table_args__ = (
+        db.Index('ix_job_created_at_id', 'created_at', 'id'),  # Newest-first listing pages
+        db.Index('ix_job_posted_by', 'posted_by'),  # Employer dashboard
+    )
+
 class Application(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -55,6 +78,31 @@ class Application(db.Model):
     status = db.Column(db.String(20), default='pending')
     applied_at = db.Column(db.DateTime, default=datetime.utcnow)
     accommodation_request = db.Column(db.Text)
+    certificate_sha256 = db.Column(db.String(64), db.ForeignKey('stored_file.sha256'))  # PWD certificate
+    certificate_name = db.Column(db.String(255))  # Original filename, for downloads
+    certificate = db.relationship('StoredFile')
+
+    __table_args__ = (
+        db.Index('uq_application_user_job', 'user_id', 'job_id', unique=True),  # One per job
+        db.Index('ix_application_job_id', 'job_id'),
+        db.Index('ix_application_certificate_sha256', 'certificate_sha256'),
+    )
+
+# NEW: Content-addressed uploads, shared by every application with the same file
+class StoredFile(db.Model):
+    sha256 = db.Column(db.String(64), primary_key=True)  # Hex digest, also the storage path
+    size = db.Column(db.Integer, nullable=False)
+    content_type = db.Column(db.String(100))
+    ref_count = db.Column(db.Integer, nullable=False, default=0)  # Applications pointing at it
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)  # Last upload or release
+    # Background PDF check (app.certificate_check), done once per distinct file
+    check_status = db.Column(db.String(20), default='pending')  # pending, valid, invalid, error
+    check_error = db.Column(db.String(255))
+    page_count = db.Column(db.Integer)
+    pdf_metadata = db.Column(db.Text)  # JSON: title, author, producer, ...
+    has_preview = db.Column(db.Boolean, default=False)  # First page PNG next to the file
+    checked_at = db.Column(db.DateTime)
 
 # NEW: JobMatch model
 class JobMatch(db.Model):
@@ -70,3 +118,60 @@ class JobMatch(db.Model):
     match_details = db.Column(db.Text)
     status = db.Column(db.String(50), default='pending')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('uq_job_match_user_job', 'user_id', 'job_id', unique=True),  # One per pair
+        db.Index('ix_job_match_user_status_score', 'user_id', 'status', 'match_score'),
+        db.Index('ix_job_match_job_id', 'job_id'),
+    )
+
+# NEW: Inverted skill indexes (normalized skill token -> job / user)
+class JobSkill(db.Model):
+    skill = db.Column(db.String(100), primary_key=True)
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), primary_key=True, index=True)
+
+class UserSkill(db.Model):
+    skill = db.Column(db.String(100), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True, index=True)
+
+# NEW: Precomputed nearest neighbours per job for the "similar jobs" panel
+class JobSimilarity(db.Model):
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), primary_key=True)
+    similar_job_id = db.Column(db.Integer, db.ForeignKey('job.id'), primary_key=True, index=True)
+    score = db.Column(db.Float, nullable=False)  # Jaccard similarity of the skill token sets
+    rank = db.Column(db.Integer, nullable=False)  # 1 = most similar
+
+    __table_args__ = (
+        db.Index('ix_job_similarity_job_rank', 'job_id', 'rank'),
+    )
+
+# NEW: Per-value job counts for the listing filter dropdowns
+class JobFacet(db.Model):
+    facet = db.Column(db.String(20), primary_key=True)  # location, work_type
+    value = db.Column(db.String(100), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+# NEW: Append-only log of job writes for the partner change feed
+class JobChange(db.Model):
+    seq = db.Column(db.Integer, primary_key=True)  # Monotonic, never reused
+    job_id = db.Column(db.Integer, nullable=False, index=True)  # No FK: outlives deleted jobs
+    op = db.Column(db.String(10), nullable=False)  # insert, update, delete
+    changed_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    __table_args__ = {'sqlite_autoincrement': True}
+
+# NEW: Background match generation queue
+class MatchTask(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(20), nullable=False)  # generate_user, rematch_user, rematch_job, check_certificate
+    target_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), default='queued', index=True)
+    error = db.Column(db.Text)
+    result = db.Column(db.Text)  # JSON summary returned by the task handler
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    __table_args__ = (
+        db.Index('ix_match_task_target', 'kind', 'target_id', 'status'),
+    )
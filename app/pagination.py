@@ -0,0 +1,57 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from app import db
+
+def encode_cursor(values):
+    """Opaque, URL-safe cursor for the sort key of the last row on a page"""
+    payload = [{'dt': value.isoformat()} if isinstance(value, datetime) else value
+               for value in values]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode()).decode().rstrip('=')
+
+def decode_cursor(cursor, size):
+    """Sort key values from a cursor, or None if it is missing or malformed"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        values = [datetime.fromisoformat(value['dt']) if isinstance(value, dict) else value
+                  for value in payload]
+    except (ValueError, TypeError, KeyError, binascii.Error):
+        return None
+    if len(values) != size:
+        return None
+    return values
+
+def seek_condition(keys, values):
+    """Rows strictly after values in keys order, a list of (expression, descending)"""
+    # k1 past v1 OR (k1 = v1 AND (k2 past v2 OR ...))
+    condition = None
+    for (expression, descending), value in reversed(list(zip(keys, values))):
+        past = expression < value if descending else expression > value
+        condition = past if condition is None else db.or_(
+            past, db.and_(expression == value, condition))
+    return condition
+
+def keyset_page(query, keys, cursor=None, per_page=20):
+    """One page of query ordered by keys, a list of (expression, descending).
+
+    The last key must be unique (e.g. the primary key). Only per_page + 1
+    rows are read no matter how deep the page is. Returns (items, next
+    cursor or None).
+    """
+    values = decode_cursor(cursor, len(keys))
+    if values is not None:
+        query = query.filter(seek_condition(keys, values))
+    query = query.add_columns(*[expression for expression, _ in keys])
+    query = query.order_by(*[expression.desc() if descending else expression.asc()
+                             for expression, descending in keys])
+    rows = query.limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(list(rows[-1][1:]))
+    return [row[0] for row in rows], next_cursor
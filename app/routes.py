@@ -1,103 +1,33 @@
-from flask import Blueprint, render_template, request, flash, redirect, url_for
+from flask import (Blueprint, render_template, request, flash, redirect, url_for, current_app,
+                   Response, stream_with_context, abort)
 from flask_login import login_user, logout_user, login_required, current_user
 from werkzeug.security import generate_password_hash, check_password_hash
+from werkzeug.utils import secure_filename
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import joinedload
 from app import db
 from app.models import User, Job, Application, JobMatch # Added JobMatch
 from app.forms import RegistrationForm, LoginForm, JobForm, ApplicationForm
-import re
-import json
+from app.matching_engine import JobMatchingEngine
+from app import tasks
+from app import search as job_search
+from app.pagination import keyset_page
+from app.facets import facet_counts
+from app.seed import create_sample_data, create_demo_accounts
+from app import api, change_feed, dashboard_stats, similarity, storage
 
 main = Blueprint('main', __name__)
 
-def create_sample_data():
-    """Create sample employer and jobs if none exist"""
-    if Job.query.count() == 0:
-        # Create sample employer
-        employer = User.query.filter_by(email='employer@demo.com').first()
-        if not employer:
-            employer = User(
-                username='TechCorp',
-                email='employer@demo.com',
-                user_type='employer',
-                password_hash=generate_password_hash('demo123')
-            )
-            db.session.add(employer)
-            db.session.commit()
-
-        # Create sample jobs
-        jobs_data = [
-            {
-                'title': 'Accessible Web Developer',
-                'company': 'TechCorp Solutions',
-                'description': 'We are seeking a passionate web developer to create accessible, inclusive digital experiences. You will work with modern frameworks like React, Vue.js, and implement WCAG 2.1 AA standards. This role offers excellent growth opportunities in accessibility technology.',
-                'requirements': '• 2+ years experience with HTML, CSS, JavaScript\n• Knowledge of WCAG 2.1 accessibility standards\n• Experience with React or Vue.js\n• Understanding of screen readers and assistive technologies\n• Strong problem-solving skills\n• Excellent communication abilities',
-                'accessibility_features': '• Height-adjustable desk and ergonomic chair\n• Screen reader compatible development environment\n• Flexible working hours (6am-10am or 9am-1pm start)\n• Full remote work option available\n• Noise-canceling headphones provided\n• Large monitor setup (27+ inches)\n• Voice recognition software available\n• Accessible parking spot reserved\n• Step-free building access with elevator',
-                'salary_range': '$65,000 - $85,000 annually',
-                'location': 'Remote / New York, NY',
-                'required_skills': 'HTML, CSS, JavaScript, React, Vue.js, WCAG, Accessibility',
-                'experience_required': '1-3',
-                'work_type': 'remote'
-            },
-            {
-                'title': 'Inclusive UX/UI Designer',
-                'company': 'Design Innovations Inc',
-                'description': 'Join our design team to create beautiful, accessible user interfaces. You will design for diverse users including those with disabilities, ensuring our products are usable by everyone. Work with design systems, conduct user research, and prototype accessible solutions.',
-                'requirements': '• 3+ years UX/UI design experience\n• Proficiency in Figma, Sketch, or Adobe XD\n• Understanding of accessibility design principles\n• Experience with user research and testing\n• Knowledge of color contrast and typography\n• Portfolio showing accessible design work',
-                'accessibility_features': '• Adjustable lighting and desk setup\n• Color blindness-friendly design tools\n• Flexible schedule for medical appointments\n• Quiet workspace environment\n• Magnification software available\n• Alternative input devices (trackball, speech-to-text)\n• Visual schedule and task management tools\n• Accessible meeting rooms with proper acoustics',
-                'salary_range': '$70,000 - $95,000 annually',
-                'location': 'Hybrid - San Francisco, CA',
-                'required_skills': 'UX Design, UI Design, Figma, Sketch, Adobe XD, User Research, Accessibility',
-                'experience_required': '3-5',
-                'work_type': 'hybrid'
-            },
-            {
-                'title': 'Customer Support Specialist',
-                'company': 'HelpDesk Solutions',
-                'description': 'Provide exceptional customer support through multiple channels including chat, email, and phone. Help customers with technical issues, account questions, and product guidance. We value empathy, patience, and problem-solving skills in creating positive customer experiences.',
-                'requirements': '• 1+ years customer service experience\n• Excellent written and verbal communication\n• Patience and empathy when helping customers\n• Basic technical troubleshooting skills\n• Ability to work in team environment\n• High school diploma or equivalent',
-                'accessibility_features': '• Text-based communication options (chat/email focus)\n• Adjustable volume headsets and amplifiers\n• Real-time captioning for team meetings\n• Visual alert systems for notifications\n• TTY/TDD phone support available\n• Sign language interpreter services\n• Flexible break schedule\n• Quiet workspace with minimal distractions',
-                'salary_range': '$40,000 - $55,000 annually',
-                'location': 'Remote / Chicago, IL',
-                'required_skills': 'Customer Service, Communication, Problem Solving, Technical Support',
-                'experience_required': '0-1',
-                'work_type': 'remote'
-            },
-            {
-                'title': 'Data Analyst - Accessibility Focus',
-                'company': 'Analytics Pro',
-                'description': 'Analyze user behavior data to improve accessibility features in our products. Create reports, identify usage patterns, and provide insights that help make our platform more inclusive. Work with SQL, Python, and visualization tools.',
-                'requirements': '• 2+ years data analysis experience\n• Proficiency in SQL and Python\n• Experience with Tableau or Power BI\n• Statistical analysis knowledge\n• Understanding of accessibility metrics\n• Bachelor\'s degree in related field preferred',
-                'accessibility_features': '• Large dual monitor setup included\n• High contrast display options\n• Voice-activated data query tools\n• Flexible work hours (core hours 10am-2pm)\n• Ergonomic keyboard and mouse\n• Standing desk option\n• Screen magnification software\n• Accessible data visualization tools',
-                'salary_range': '$58,000 - $75,000 annually',
-                'location': 'Hybrid - Austin, TX',
-                'required_skills': 'SQL, Python, Data Analysis, Tableau, Power BI, Statistics',
-                'experience_required': '1-3',
-                'work_type': 'hybrid'
-            }
-        ]
-
-        for job_data in jobs_data:
-            job = Job(
-                title=job_data['title'],
-                company=job_data['company'],
-                description=job_data['description'],
-                requirements=job_data['requirements'],
-                accessibility_features=job_data['accessibility_features'],
-                salary_range=job_data['salary_range'],
-                location=job_data['location'],
-                posted_by=employer.id,
-                required_skills=job_data['required_skills'],
-                experience_required=job_data['experience_required'],
-                work_type=job_data['work_type']
-            )
-            db.session.add(job)
-        
-        db.session.commit()
-        print("✅ Created 4 sample jobs!")
+def job_listing_page(jobs_query, rank=None):
+    """Keyset page of a job listing: newest first, or by search relevance"""
+    keys = [(Job.created_at, True), (Job.id, True)]
+    if rank is not None:
+        keys = [(rank, False), (Job.id, True)]
+    return keyset_page(jobs_query, keys, request.args.get('after'),
+                       current_app.config['JOBS_PER_PAGE'])
 
 @main.route('/')
 def index():
-    create_sample_data()
     jobs = Job.query.order_by(Job.created_at.desc()).limit(3).all()
     return render_template('index.html', jobs=jobs)
 
@@ -148,35 +78,27 @@ def login():
 @main.route('/dashboard')
 @login_required
 def dashboard():
-    # Create sample data if none exists
-    create_sample_data()
-    
-    # Get user stats
-    total_jobs = Job.query.count()
+    # Per-user counters in one query; site-wide figures from a short-TTL cache
+    counters = dashboard_stats.user_counters(current_user.id)
+    site = dashboard_stats.global_stats()
+    total_jobs = site['total_jobs']
+    recent_jobs = site['recent_jobs']
     if current_user.user_type == 'job_seeker':
-        my_applications = Application.query.filter_by(user_id=current_user.id).count()
-        my_matches = JobMatch.query.filter_by(user_id=current_user.id).count()
+        my_applications = counters['applications']
+        my_matches = counters['matches']
         my_jobs = 0
         
-        # Get pending matches for quick access
-        pending_matches = JobMatch.query.filter_by(
-            user_id=current_user.id, 
-            status='pending'
-        ).limit(3).all()
-        
         dashboard_data = {
-            'show_matching_card': my_matches == 0 or pending_matches,
-            'pending_matches': pending_matches,
+            'show_matching_card': my_matches == 0 or counters['pending'],
+            'pending_matches': counters['pending'],
             'my_matches': my_matches
         }
     else:
         my_applications = 0
         my_matches = 0
-        my_jobs = Job.query.filter_by(posted_by=current_user.id).count()
+        my_jobs = counters['posted_jobs']
         dashboard_data = {}
 
-    recent_jobs = Job.query.order_by(Job.created_at.desc()).limit(3).all()
-
     return render_template('dashboard.html',
                          total_jobs=total_jobs,
                          my_applications=my_applications,
@@ -186,51 +108,35 @@ def dashboard():
 
 @main.route('/jobs')
 def jobs():
-    # Create sample data if none exists
-    create_sample_data()
-    
     # Get search parameters
     search_query = request.args.get('search', '').strip()
     location_filter = request.args.get('location', '').strip()
     work_type_filter = request.args.get('work_type', '').strip()
     
-    # Start with all jobs
-    jobs_query = Job.query
-    
-    # Apply search filters
-    if search_query:
-        jobs_query = jobs_query.filter(
-            db.or_(
-                Job.title.contains(search_query),
-                Job.company.contains(search_query),
-                Job.description.contains(search_query),
-                Job.required_skills.contains(search_query)
-            )
-        )
-    
-    if location_filter:
-        jobs_query = jobs_query.filter(Job.location.contains(location_filter))
-    
-    if work_type_filter:
-        jobs_query = jobs_query.filter(Job.work_type == work_type_filter)
-    
-    # Get filtered jobs
-    all_jobs = jobs_query.order_by(Job.created_at.desc()).all()
+    # Apply search filters (full-text index, ranked by relevance)
+    jobs_query, rank = job_search.filter_listing(Job.query, search_query,
+                                                 location_filter, work_type_filter)
     
-    # Get unique locations and work types for filter dropdowns
-    locations = db.session.query(Job.location).distinct().filter(Job.location != None).all()
-    locations = [loc[0] for loc in locations if loc[0]]
+    # One page of results, most relevant first when searching
+    page_jobs, next_cursor = job_listing_page(jobs_query, rank)
     
-    work_types = db.session.query(Job.work_type).distinct().filter(Job.work_type != None).all()
-    work_types = [wt[0] for wt in work_types if wt[0]]
+    # Filter dropdowns: (value, job count) under the other active filters
+    counts = facet_counts(search_query, location_filter, work_type_filter)
+
+    filters = {'search': search_query or None, 'location': location_filter or None,
+               'work_type': work_type_filter or None}
+    next_url = url_for('main.jobs', after=next_cursor, **filters) if next_cursor else None
+    first_url = url_for('main.jobs', **filters) if request.args.get('after') else None
 
     return render_template('jobs.html',
-                         jobs=all_jobs,
+                         jobs=page_jobs,
+                         next_url=next_url,
+                         first_url=first_url,
                          search=search_query,
                          location_filter=location_filter,
                          work_type_filter=work_type_filter,
-                         locations=locations,
-                         work_types=work_types)
+                         locations=counts['location'],
+                         work_types=counts['work_type'])
 
 @main.route('/job/<int:id>')
 def job_detail(id):
@@ -242,14 +148,8 @@ def job_detail(id):
         already_applied = Application.query.filter_by(
             user_id=current_user.id, job_id=id).first() is not None
     
-    # Get similar jobs
-    similar_jobs = Job.query.filter(
-        Job.id != id,
-        db.or_(
-            Job.required_skills.contains(job.required_skills.split(',')[0] if job.required_skills else ''),
-            Job.work_type == job.work_type
-        )
-    ).limit(3).all()
+    # Precomputed neighbours, kept current by app.similarity on job writes
+    similar_jobs = similarity.similar_jobs(id)
 
     return render_template('job_detail.html', 
                          job=job, 
@@ -275,7 +175,7 @@ def apply_job(job_id):
     if request.method == 'POST':
         # Handle PWD certificate file upload
         pwd_certificate = request.files.get('pwd_certificate')
-        certificate_filename = None
+        certificate_sha256 = certificate_name = None
         
         if pwd_certificate and pwd_certificate.filename:
             # Validate file type
@@ -283,27 +183,19 @@ def apply_job(job_id):
                 flash('PWD certificate must be a PDF file.', 'error')
                 return render_template('apply_form.html', job=job)
             
-            # Create uploads directory if it doesn't exist
-            import os
-            upload_dir = 'uploads/certificates'
-            os.makedirs(upload_dir, exist_ok=True)
-            
-            # Save file with secure filename
-            from werkzeug.utils import secure_filename
-            import uuid
-            filename = secure_filename(pwd_certificate.filename)
-            unique_filename = f"{uuid.uuid4()}_{filename}"
-            certificate_path = os.path.join(upload_dir, unique_filename)
-            pwd_certificate.save(certificate_path)
-            certificate_filename = unique_filename
+            # Hashed while the upload streamed in; identical files are stored once
+            certificate_sha256 = storage.store_upload(pwd_certificate)
+            certificate_name = secure_filename(pwd_certificate.filename)
         
         # Create application record
-        accommodation_text = f"Disabilities: {', '.join(request.form.getlist('disability_type'))}\nDetails: {request.form.get('accommodation_details')}\nCertificate: {certificate_filename}"
+        accommodation_text = f"Disabilities: {', '.join(request.form.getlist('disability_type'))}\nDetails: {request.form.get('accommodation_details')}"
         
         application = Application(
             user_id=current_user.id,
             job_id=job_id,
-            accommodation_request=accommodation_text
+            accommodation_request=accommodation_text,
+            certificate_sha256=certificate_sha256,
+            certificate_name=certificate_name
         )
         db.session.add(application)
         
@@ -312,7 +204,17 @@ def apply_job(job_id):
         if job_match:
             job_match.status = 'applied'
         
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent submit (e.g. a double click) already created it
+            db.session.rollback()
+            flash('You have already applied for this job.', 'info')
+            return redirect(url_for('main.job_detail', id=job_id))
+        
+        # Validate the PDF and render its preview in the background (once per distinct file)
+        if application.certificate and application.certificate.check_status == 'pending':
+            tasks.enqueue('check_certificate', application.id)
         
         flash('Application with PWD certificate submitted successfully!', 'success')
         return redirect(url_for('main.my_applications'))
@@ -327,7 +229,10 @@ def my_applications():
         flash('Only job seekers can view applications.', 'error')
         return redirect(url_for('main.dashboard'))
     
-    applications = Application.query.filter_by(user_id=current_user.id)\
+    # Jobs and certificate check results come in the same query (no lazy load per row)
+    applications = Application.query.options(joinedload(Application.job, innerjoin=True),
+                                             joinedload(Application.certificate))\
+                                  .filter_by(user_id=current_user.id)\
                                   .order_by(Application.applied_at.desc()).all()
     
     return render_template('my_applications.html', applications=applications)
@@ -371,6 +276,35 @@ def withdraw_application(application_id):
     flash(f'Successfully withdrew application for "{job_title}". You can apply again later.', 'success')
     return redirect(url_for('main.my_applications'))
 
+def certificate_for_download(application_id, sha256):
+    """Application whose certificate the current user may read, or abort"""
+    application = Application.query.options(joinedload(Application.job, innerjoin=True),
+                                            joinedload(Application.certificate))\
+                                   .get_or_404(application_id)
+    # The applicant and the employer who posted the job
+    if current_user.id not in (application.user_id, application.job.posted_by):
+        abort(403)
+    if application.certificate is None or application.certificate_sha256 != sha256:
+        abort(404)
+    return application
+
+@main.route('/application/<int:application_id>/certificate/<sha256>')
+@login_required
+def application_certificate(application_id, sha256):
+    """PWD certificate PDF of an application; the URL carries its content hash"""
+    application = certificate_for_download(application_id, sha256)
+    return storage.send_stored_file(application.certificate,
+                                    application.certificate_name or 'certificate.pdf')
+
+@main.route('/application/<int:application_id>/certificate/<sha256>/preview.png')
+@login_required
+def application_certificate_preview(application_id, sha256):
+    """First page of the certificate as an image, when the PDF check rendered one"""
+    application = certificate_for_download(application_id, sha256)
+    if not application.certificate.has_preview:
+        abort(404)
+    return storage.send_stored_file(application.certificate, 'certificate-preview.png', preview=True)
+
 @main.route('/post-job', methods=['GET', 'POST'])
 @login_required
 def post_job():
@@ -388,11 +322,17 @@ def post_job():
             accessibility_features=form.accessibility_features.data,
             salary_range=form.salary_range.data,
             location=form.location.data,
-            posted_by=current_user.id
+            posted_by=current_user.id,
+            required_skills=form.required_skills.data,
+            experience_required=form.experience_required.data or None,
+            work_type=form.work_type.data or None
         )
         db.session.add(job)
         db.session.commit()
         
+        # Score the new job against matching seekers only, in the background
+        tasks.enqueue('rematch_job', job.id)
+        
         flash('Job posted successfully! It is now visible to job seekers.', 'success')
         return redirect(url_for('main.my_jobs'))
 
@@ -424,7 +364,13 @@ def profile():
         current_user.accessibility_needs = request.form.get('accessibility_needs', current_user.accessibility_needs)
         current_user.work_preferences = request.form.get('work_preferences', current_user.work_preferences)
         
+        rematch = (current_user.user_type == 'job_seeker' and
+                   JobMatchingEngine.matching_fields_changed(current_user))
         db.session.commit()
+        
+        # Rescore only this seeker's matches when match inputs changed
+        if rematch:
+            tasks.enqueue('rematch_user', current_user.id)
         flash('Profile updated successfully!', 'success')
         return redirect(url_for('main.profile'))
     
@@ -444,56 +390,6 @@ def profile():
                          matches=matches)
 
 # Job Matching Game Routes
-def calculate_match_score(user, job):
-    """Enhanced matching algorithm"""
-    score = 0.0
-    
-    # Skills match (40% weight)
-    if user.skills and job.required_skills:
-        user_skills = [s.strip().lower() for s in user.skills.split(',')]
-        job_skills = [s.strip().lower() for s in job.required_skills.split(',')]
-        matching_skills = set(user_skills) & set(job_skills)
-        skills_score = (len(matching_skills) / len(job_skills)) * 40 if job_skills else 0
-        score += skills_score
-    else:
-        score += 20  # Neutral score if no skills specified
-    
-    # Experience match (25% weight)
-    if user.experience_level and job.experience_required:
-        exp_levels = {'0-1': 1, '1-3': 2, '3-5': 3, '5-10': 4, '10+': 5}
-        user_exp = exp_levels.get(user.experience_level, 0)
-        job_exp = exp_levels.get(job.experience_required, 0)
-        if user_exp and job_exp:
-            exp_diff = abs(user_exp - job_exp)
-            exp_score = max(0, 25 - (exp_diff * 5))
-            score += exp_score
-        else:
-            score += 12.5
-    else:
-        score += 12.5
-    
-    # Location match (15% weight)
-    if job.work_type == 'remote':
-        score += 15
-    elif user.preferred_location and job.location:
-        if any(word in job.location.lower() for word in user.preferred_location.lower().split()):
-            score += 15
-        else:
-            score += 5
-    else:
-        score += 10
-    
-    # Accessibility match (20% weight)
-    if user.disability_type and job.accessibility_features:
-        if user.disability_type.lower() in job.accessibility_features.lower():
-            score += 20
-        else:
-            score += 10
-    else:
-        score += 15
-    
-    return min(100.0, score)
-
 @main.route('/job-matching-game')
 @login_required
 def job_matching_game():
@@ -507,43 +403,26 @@ def job_matching_game():
         flash('Please complete your profile to get better job matches!', 'info')
         return redirect(url_for('main.complete_profile'))
     
-    # Get or generate matches
+    # Get the best pending match
     matches = JobMatch.query.filter_by(
         user_id=current_user.id,
         status='pending'
     ).order_by(JobMatch.match_score.desc()).limit(1).all()
     
+    computing = False
     if not matches:
-        # Generate new matches
-        jobs = Job.query.all()
-        for job in jobs:
-            # Skip if already applied or matched
-            if Application.query.filter_by(user_id=current_user.id, job_id=job.id).first():
-                continue
-            if JobMatch.query.filter_by(user_id=current_user.id, job_id=job.id).first():
-                continue
-            
-            # Calculate match score
-            match_score = calculate_match_score(current_user, job)
-            if match_score >= 30:  # Only show matches above 30%
-                job_match = JobMatch(
-                    user_id=current_user.id,
-                    job_id=job.id,
-                    match_score=match_score,
-                    skills_match=match_score * 0.4,
-                    experience_match=match_score * 0.25,
-                    location_match=match_score * 0.15,
-                    accessibility_match=match_score * 0.2,
-                    salary_match=75.0,
-                    match_details=json.dumps({'generated': True})
-                )
-                db.session.add(job_match)
+        # Generate new matches off the request path
+        task = tasks.active_user_task(current_user.id)
+        if not task and tasks.needs_generation(current_user.id):
+            task = tasks.enqueue('generate_user', current_user.id)
         
-        db.session.commit()
-        matches = JobMatch.query.filter_by(
-            user_id=current_user.id,
-            status='pending'
-        ).order_by(JobMatch.match_score.desc()).limit(1).all()
+        if task:
+            db.session.refresh(task)
+            computing = task.status in tasks.ACTIVE_STATUSES
+            matches = JobMatch.query.filter_by(
+                user_id=current_user.id,
+                status='pending'
+            ).order_by(JobMatch.match_score.desc()).limit(1).all()
     
     # Get current match for the game
     current_match = matches[0] if matches else None
@@ -551,7 +430,18 @@ def job_matching_game():
     
     return render_template('job_matching_game.html', 
                          current_match=current_match,
-                         total_matches=total_matches)
+                         total_matches=total_matches,
+                         computing=computing)
+
+@main.route('/job-matching-game/status')
+@login_required
+def job_matching_status():
+    """Polled by the game page while matches are being computed"""
+    pending = JobMatch.query.filter_by(user_id=current_user.id, status='pending').count()
+    return {
+        'computing': tasks.active_user_task(current_user.id) is not None,
+        'pending_matches': pending
+    }
 
 @main.route('/complete-profile', methods=['GET', 'POST'])
 @login_required
@@ -565,7 +455,13 @@ def complete_profile():
         current_user.accessibility_needs = request.form.get('accessibility_needs')
         current_user.work_preferences = request.form.get('work_preferences')
         
+        rematch = (current_user.user_type == 'job_seeker' and
+                   JobMatchingEngine.matching_fields_changed(current_user))
         db.session.commit()
+        
+        # Rescore only this seeker's matches when match inputs changed
+        if rematch:
+            tasks.enqueue('rematch_user', current_user.id)
         flash('Profile completed! Now let\'s find your perfect job matches.', 'success')
         return redirect(url_for('main.job_matching_game'))
     
@@ -605,20 +501,20 @@ def my_matches():
     
     status_filter = request.args.get('status', 'all')
     
-    matches_query = JobMatch.query.filter_by(user_id=current_user.id)
+    # One query: matches, their jobs, and whether an application exists
+    matches_query = db.session.query(JobMatch, Application.id)\
+        .outerjoin(Application, db.and_(Application.user_id == JobMatch.user_id,
+                                        Application.job_id == JobMatch.job_id))\
+        .options(joinedload(JobMatch.job, innerjoin=True))\
+        .filter(JobMatch.user_id == current_user.id)
     
     if status_filter != 'all':
-        matches_query = matches_query.filter_by(status=status_filter)
+        matches_query = matches_query.filter(JobMatch.status == status_filter)
     
-    matches = matches_query.order_by(JobMatch.match_score.desc()).all()
-    
-    # Add application status to each match - FIXED APPROACH
-    for match in matches:
-        # Check if user has an active application for this job
-        match.has_active_application = Application.query.filter_by(
-            user_id=current_user.id,
-            job_id=match.job.id
-        ).first() is not None
+    matches = []
+    for match, application_id in matches_query.order_by(JobMatch.match_score.desc()).all():
+        match.has_active_application = application_id is not None
+        matches.append(match)
     
     return render_template('my_matches.html', matches=matches, status_filter=status_filter)
 
@@ -630,18 +526,14 @@ def search():
     if not query:
         return redirect(url_for('main.jobs'))
     
-    # Search in jobs
-    jobs = Job.query.filter(
-        db.or_(
-            Job.title.contains(query),
-            Job.company.contains(query),
-            Job.description.contains(query),
-            Job.accessibility_features.contains(query),
-            Job.required_skills.contains(query)
-        )
-    ).all()
+    # Search in jobs, most relevant first
+    jobs_query, rank = job_search.filter_jobs(Job.query, query)
+    page_jobs, next_cursor = job_listing_page(jobs_query, rank)
+    next_url = url_for('main.search', q=query, after=next_cursor) if next_cursor else None
+    first_url = url_for('main.search', q=query) if request.args.get('after') else None
     
-    return render_template('jobs.html', jobs=jobs, search=query)
+    return render_template('jobs.html', jobs=page_jobs, search=query,
+                           next_url=next_url, first_url=first_url)
 
 @main.route('/logout')
 @login_required
@@ -655,30 +547,7 @@ def logout():
 @main.route('/create-demo')
 def create_demo():
     """Create demo accounts for testing"""
-    # Create demo job seeker
-    demo_seeker = User.query.filter_by(email='demo@jobseeker.com').first()
-    if not demo_seeker:
-        demo_seeker = User(
-            username='DemoJobSeeker',
-            email='demo@jobseeker.com',
-            user_type='job_seeker',
-            disability_type='visual',
-            password_hash=generate_password_hash('demo123')
-        )
-        db.session.add(demo_seeker)
-    
-    # Create demo employer
-    demo_employer = User.query.filter_by(email='demo@employer.com').first()
-    if not demo_employer:
-        demo_employer = User(
-            username='DemoEmployer',
-            email='demo@employer.com',
-            user_type='employer',
-            password_hash=generate_password_hash('demo123')
-        )
-        db.session.add(demo_employer)
-    
-    db.session.commit()
+    create_demo_accounts()
     create_sample_data()
     
     return '''
@@ -710,16 +579,41 @@ def create_demo():
 
 @main.route('/api/jobs')
 def api_jobs():
-    """API endpoint for job data"""
-    jobs = Job.query.all()
-    jobs_data = []
-    for job in jobs:
-        jobs_data.append({
-            'id': job.id,
-            'title': job.title,
-            'company': job.company,
-            'location': job.location,
-            'accessibility_features': job.accessibility_features,
-            'created_at': job.created_at.strftime('%Y-%m-%d')
-        })
-    return {'jobs': jobs_data, 'total': len(jobs_data)}
+    """API endpoint for job data: streamed, keyset-paginated, conditional GET"""
+    try:
+        fields = api.parse_fields(request.args.get('fields'))
+        limit = api.parse_limit(request.args.get('limit'))
+    except ValueError as error:
+        return {'error': str(error)}, 400
+    cursor = request.args.get('cursor')
+    ndjson = request.args.get('format') == 'ndjson' or \
+        request.accept_mimetypes.best == 'application/x-ndjson'
+
+    # Unchanged polls are answered from one aggregate query
+    etag, last_modified, change_seq, total = api.feed_validators([fields, limit, cursor, ndjson])
+    if api.not_modified(request, etag, last_modified):
+        response = Response(status=304)
+    else:
+        response = Response(
+            stream_with_context(api.stream_jobs(fields, limit, cursor, ndjson, total)),
+            mimetype='application/x-ndjson' if ndjson else 'application/json'
+        )
+    response.set_etag(etag)
+    response.last_modified = last_modified
+    response.cache_control.no_cache = True
+    # Pass as ?since= to /api/jobs/changes to sync incrementally from this snapshot
+    response.headers['X-Change-Seq'] = str(change_seq)
+    return response
+
+@main.route('/api/jobs/changes')
+def api_job_changes():
+    """Job inserts, updates and deletes logged after ?since=<seq>"""
+    try:
+        since = int(request.args.get('since', 0))
+        fields = api.parse_fields(request.args.get('fields'))
+        limit = api.parse_limit(request.args.get('limit'))
+    except ValueError as error:
+        return {'error': str(error)}, 400
+
+    changes, next_since, has_more = change_feed.changes_since(since, fields, limit)
+    return {'changes': changes, 'next_since': next_since, 'has_more': has_more}
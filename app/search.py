@@ -0,0 +1,119 @@
+import re
+from sqlalchemy import table, column, literal_column, text, func
+from app import db
+from app.models import Job
+
+# Job columns covered by the full-text index
+SEARCH_COLUMNS = ('title', 'company', 'description', 'accessibility_features', 'required_skills')
+
+# SQLite: external-content FTS5 table kept in sync by triggers
+_FTS_COLUMNS = ', '.join(SEARCH_COLUMNS)
+_FTS_NEW = ', '.join(f'new.{name}' for name in SEARCH_COLUMNS)
+_FTS_OLD = ', '.join(f'old.{name}' for name in SEARCH_COLUMNS)
+SQLITE_DDL = [
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS job_fts USING fts5({_FTS_COLUMNS}, "
+    f"content='job', content_rowid='id', tokenize='porter unicode61')",
+    f"CREATE TRIGGER IF NOT EXISTS job_fts_ai AFTER INSERT ON job BEGIN "
+    f"INSERT INTO job_fts(rowid, {_FTS_COLUMNS}) VALUES (new.id, {_FTS_NEW}); END",
+    f"CREATE TRIGGER IF NOT EXISTS job_fts_ad AFTER DELETE ON job BEGIN "
+    f"INSERT INTO job_fts(job_fts, rowid, {_FTS_COLUMNS}) VALUES ('delete', old.id, {_FTS_OLD}); END",
+    f"CREATE TRIGGER IF NOT EXISTS job_fts_au AFTER UPDATE ON job BEGIN "
+    f"INSERT INTO job_fts(job_fts, rowid, {_FTS_COLUMNS}) VALUES ('delete', old.id, {_FTS_OLD}); "
+    f"INSERT INTO job_fts(rowid, {_FTS_COLUMNS}) VALUES (new.id, {_FTS_NEW}); END",
+]
+
+# PostgreSQL: GIN expression index; queries must use the identical expression
+PG_DOCUMENT = "to_tsvector('english', " + " || ' ' || ".join(
+    f"coalesce({name}, '')" for name in SEARCH_COLUMNS) + ")"
+PG_DDL = [f"CREATE INDEX IF NOT EXISTS ix_job_search ON job USING GIN ({PG_DOCUMENT})"]
+
+job_fts = table('job_fts', column('rowid'), column('rank'))
+
+_installed = {}
+
+def _dialect():
+    return db.engine.dialect.name
+
+def install_search_index(connection=None):
+    """Create the full-text index for the current database (idempotent)"""
+    if connection is None:
+        with db.engine.begin() as connection:
+            return install_search_index(connection)
+
+    dialect = connection.dialect.name
+    if dialect == 'sqlite':
+        exists = connection.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_fts'"
+        )).first()
+        for statement in SQLITE_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            # Index rows that were inserted before the triggers existed
+            connection.execute(text("INSERT INTO job_fts(job_fts) VALUES ('rebuild')"))
+    elif dialect == 'postgresql':
+        for statement in PG_DDL:
+            connection.execute(text(statement))
+    _installed[str(connection.engine.url)] = dialect in ('sqlite', 'postgresql')
+
+def search_index_available():
+    """Whether the full-text index exists; checked once per process and database"""
+    url = str(db.engine.url)
+    if url not in _installed:
+        dialect = _dialect()
+        if dialect == 'sqlite':
+            found = db.session.execute(text(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'job_fts'"
+            )).first()
+        elif dialect == 'postgresql':
+            found = db.session.execute(text(
+                "SELECT 1 FROM pg_indexes WHERE indexname = 'ix_job_search'"
+            )).first()
+        else:
+            found = None
+        _installed[url] = found is not None
+    return _installed[url]
+
+def search_terms(query_text):
+    """Words of a free-text query, safe to embed in an FTS expression"""
+    return re.findall(r'\w+', query_text.lower())
+
+def filter_jobs(jobs_query, query_text):
+    """Restrict a Job query to full-text matches.
+
+    Returns (query, rank) where ordering by rank ascending puts the most
+    relevant jobs first. Falls back to LIKE matching (rank None) when no
+    full-text index is available.
+    """
+    terms = search_terms(query_text)
+    if terms and search_index_available():
+        if _dialect() == 'sqlite':
+            # Prefix match every word, e.g. "develop"* AND "python"*
+            expression = ' '.join(f'"{term}"*' for term in terms)
+            jobs_query = jobs_query.join(job_fts, job_fts.c.rowid == Job.id)\
+                                   .filter(literal_column('job_fts').op('MATCH')(expression))
+            return jobs_query, job_fts.c.rank
+        tsquery = func.to_tsquery('english', ' & '.join(f'{term}:*' for term in terms))
+        document = literal_column(PG_DOCUMENT)
+        jobs_query = jobs_query.filter(document.op('@@')(tsquery))
+        return jobs_query, -func.ts_rank(document, tsquery)
+
+    return jobs_query.filter(
+        db.or_(
+            Job.title.contains(query_text),
+            Job.company.contains(query_text),
+            Job.description.contains(query_text),
+            Job.accessibility_features.contains(query_text),
+            Job.required_skills.contains(query_text)
+        )
+    ), None
+
+def filter_listing(jobs_query, search_query='', location='', work_type=''):
+    """Apply the /jobs listing filters; returns (query, rank) like filter_jobs"""
+    rank = None
+    if search_query:
+        jobs_query, rank = filter_jobs(jobs_query, search_query)
+    if location:
+        jobs_query = jobs_query.filter(Job.location.contains(location))
+    if work_type:
+        jobs_query = jobs_query.filter(Job.work_type == work_type)
+    return jobs_query, rank
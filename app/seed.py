@@ -0,0 +1,116 @@
+from werkzeug.security import generate_password_hash
+from app import db
+from app.models import User, Job
+
+def create_sample_data():
+    """Create sample employer and jobs if none exist"""
+    if Job.query.count() == 0:
+        # Create sample employer
+        employer = User.query.filter_by(email='employer@demo.com').first()
+        if not employer:
+            employer = User(
+                username='TechCorp',
+                email='employer@demo.com',
+                user_type='employer',
+                password_hash=generate_password_hash('demo123')
+            )
+            db.session.add(employer)
+            db.session.commit()
+
+        # Create sample jobs
+        jobs_data = [
+            {
+                'title': 'Accessible Web Developer',
+                'company': 'TechCorp Solutions',
+                'description': 'We are seeking a passionate web developer to create accessible, inclusive digital experiences. You will work with modern frameworks like React, Vue.js, and implement WCAG 2.1 AA standards. This role offers excellent growth opportunities in accessibility technology.',
+                'requirements': '• 2+ years experience with HTML, CSS, JavaScript\n• Knowledge of WCAG 2.1 accessibility standards\n• Experience with React or Vue.js\n• Understanding of screen readers and assistive technologies\n• Strong problem-solving skills\n• Excellent communication abilities',
+                'accessibility_features': '• Height-adjustable desk and ergonomic chair\n• Screen reader compatible development environment\n• Flexible working hours (6am-10am or 9am-1pm start)\n• Full remote work option available\n• Noise-canceling headphones provided\n• Large monitor setup (27+ inches)\n• Voice recognition software available\n• Accessible parking spot reserved\n• Step-free building access with elevator',
+                'salary_range': '$65,000 - $85,000 annually',
+                'location': 'Remote / New York, NY',
+                'required_skills': 'HTML, CSS, JavaScript, React, Vue.js, WCAG, Accessibility',
+                'experience_required': '1-3',
+                'work_type': 'remote'
+            },
+            {
+                'title': 'Inclusive UX/UI Designer',
+                'company': 'Design Innovations Inc',
+                'description': 'Join our design team to create beautiful, accessible user interfaces. You will design for diverse users including those with disabilities, ensuring our products are usable by everyone. Work with design systems, conduct user research, and prototype accessible solutions.',
+                'requirements': '• 3+ years UX/UI design experience\n• Proficiency in Figma, Sketch, or Adobe XD\n• Understanding of accessibility design principles\n• Experience with user research and testing\n• Knowledge of color contrast and typography\n• Portfolio showing accessible design work',
+                'accessibility_features': '• Adjustable lighting and desk setup\n• Color blindness-friendly design tools\n• Flexible schedule for medical appointments\n• Quiet workspace environment\n• Magnification software available\n• Alternative input devices (trackball, speech-to-text)\n• Visual schedule and task management tools\n• Accessible meeting rooms with proper acoustics',
+                'salary_range': '$70,000 - $95,000 annually',
+                'location': 'Hybrid - San Francisco, CA',
+                'required_skills': 'UX Design, UI Design, Figma, Sketch, Adobe XD, User Research, Accessibility',
+                'experience_required': '3-5',
+                'work_type': 'hybrid'
+            },
+            {
+                'title': 'Customer Support Specialist',
+                'company': 'HelpDesk Solutions',
+                'description': 'Provide exceptional customer support through multiple channels including chat, email, and phone. Help customers with technical issues, account questions, and product guidance. We value empathy, patience, and problem-solving skills in creating positive customer experiences.',
+                'requirements': '• 1+ years customer service experience\n• Excellent written and verbal communication\n• Patience and empathy when helping customers\n• Basic technical troubleshooting skills\n• Ability to work in team environment\n• High school diploma or equivalent',
+                'accessibility_features': '• Text-based communication options (chat/email focus)\n• Adjustable volume headsets and amplifiers\n• Real-time captioning for team meetings\n• Visual alert systems for notifications\n• TTY/TDD phone support available\n• Sign language interpreter services\n• Flexible break schedule\n• Quiet workspace with minimal distractions',
+                'salary_range': '$40,000 - $55,000 annually',
+                'location': 'Remote / Chicago, IL',
+                'required_skills': 'Customer Service, Communication, Problem Solving, Technical Support',
+                'experience_required': '0-1',
+                'work_type': 'remote'
+            },
+            {
+                'title': 'Data Analyst - Accessibility Focus',
+                'company': 'Analytics Pro',
+                'description': 'Analyze user behavior data to improve accessibility features in our products. Create reports, identify usage patterns, and provide insights that help make our platform more inclusive. Work with SQL, Python, and visualization tools.',
+                'requirements': '• 2+ years data analysis experience\n• Proficiency in SQL and Python\n• Experience with Tableau or Power BI\n• Statistical analysis knowledge\n• Understanding of accessibility metrics\n• Bachelor\'s degree in related field preferred',
+                'accessibility_features': '• Large dual monitor setup included\n• High contrast display options\n• Voice-activated data query tools\n• Flexible work hours (core hours 10am-2pm)\n• Ergonomic keyboard and mouse\n• Standing desk option\n• Screen magnification software\n• Accessible data visualization tools',
+                'salary_range': '$58,000 - $75,000 annually',
+                'location': 'Hybrid - Austin, TX',
+                'required_skills': 'SQL, Python, Data Analysis, Tableau, Power BI, Statistics',
+                'experience_required': '1-3',
+                'work_type': 'hybrid'
+            }
+        ]
+
+        for job_data in jobs_data:
+            job = Job(
+                title=job_data['title'],
+                company=job_data['company'],
+                description=job_data['description'],
+                requirements=job_data['requirements'],
+                accessibility_features=job_data['accessibility_features'],
+                salary_range=job_data['salary_range'],
+                location=job_data['location'],
+                posted_by=employer.id,
+                required_skills=job_data['required_skills'],
+                experience_required=job_data['experience_required'],
+                work_type=job_data['work_type']
+            )
+            db.session.add(job)
+        
+        db.session.commit()
+        print("✅ Created 4 sample jobs!")
+
+def create_demo_accounts():
+    """Create the demo job seeker and employer logins if missing"""
+    # Create demo job seeker
+    demo_seeker = User.query.filter_by(email='demo@jobseeker.com').first()
+    if not demo_seeker:
+        demo_seeker = User(
+            username='DemoJobSeeker',
+            email='demo@jobseeker.com',
+            user_type='job_seeker',
+            disability_type='visual',
+            password_hash=generate_password_hash('demo123')
+        )
+        db.session.add(demo_seeker)
+    
+    # Create demo employer
+    demo_employer = User.query.filter_by(email='demo@employer.com').first()
+    if not demo_employer:
+        demo_employer = User(
+            username='DemoEmployer',
+            email='demo@employer.com',
+            user_type='employer',
+            password_hash=generate_password_hash('demo123')
+        )
+        db.session.add(demo_employer)
+    
+    db.session.commit()
@@ -0,0 +1,131 @@
+from sqlalchemy import event, select, delete, func
+from sqlalchemy.orm import aliased
+from app import db
+from app.models import Job, JobSkill, JobSimilarity
+# Imported first so its listeners run before ours: the skill index already
+# reflects a job's new skills when its neighbours are recomputed
+from app import skill_index  # noqa: F401
+
+# Neighbours stored per job; job_detail shows the first few, the rest
+# keep lists full when a neighbour is deleted
+STORED_NEIGHBOURS = 10
+SHOWN_NEIGHBOURS = 3
+
+def _similarities(connection, job_id):
+    """{other job id: Jaccard similarity} for every job sharing a skill token"""
+    own_size = connection.execute(
+        select(func.count()).select_from(JobSkill).where(JobSkill.job_id == job_id)
+    ).scalar()
+    if not own_size:
+        return {}
+    own_tokens = select(JobSkill.skill).where(JobSkill.job_id == job_id)
+    shared = select(JobSkill.job_id, func.count().label('shared'))\
+        .where(JobSkill.skill.in_(own_tokens), JobSkill.job_id != job_id)\
+        .group_by(JobSkill.job_id).subquery()
+    other = aliased(JobSkill)
+    other_size = select(func.count()).select_from(other)\
+        .where(other.job_id == shared.c.job_id).scalar_subquery()
+    return {
+        other_id: common / (own_size + size - common)
+        for other_id, common, size in connection.execute(
+            select(shared.c.job_id, shared.c.shared, other_size))
+    }
+
+def _top(scores):
+    """Best neighbours as [(job id, score)]; newer jobs win ties"""
+    return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))[:STORED_NEIGHBOURS]
+
+def _store(connection, job_id, neighbours):
+    connection.execute(delete(JobSimilarity).where(JobSimilarity.job_id == job_id))
+    if neighbours:
+        connection.execute(JobSimilarity.__table__.insert(), [
+            {'job_id': job_id, 'similar_job_id': other_id, 'score': score, 'rank': rank}
+            for rank, (other_id, score) in enumerate(neighbours, start=1)
+        ])
+
+def _recompute(connection, job_id):
+    _store(connection, job_id, _top(_similarities(connection, job_id)))
+
+def refresh_job(connection, job_id):
+    """Recompute a new or re-skilled job's neighbours and patch the lists it enters or leaves"""
+    scores = _similarities(connection, job_id)
+    _store(connection, job_id, _top(scores))
+
+    # Current lists of the jobs sharing a skill, plus those that listed this job
+    sharing = select(JobSkill.job_id).where(
+        JobSkill.skill.in_(select(JobSkill.skill).where(JobSkill.job_id == job_id)))
+    listing = aliased(JobSimilarity)
+    listers = select(listing.job_id).where(listing.similar_job_id == job_id)
+    listed = {}
+    for owner, other_id, score in connection.execute(
+            select(JobSimilarity.job_id, JobSimilarity.similar_job_id, JobSimilarity.score)
+            .where(db.or_(JobSimilarity.job_id.in_(sharing),
+                          JobSimilarity.job_id.in_(listers)),
+                   JobSimilarity.job_id != job_id)):
+        listed.setdefault(owner, {})[other_id] = score
+
+    # Jaccard is symmetric: this job's score from owner's side is scores[owner]
+    for owner in set(scores) | set(listed):
+        current = listed.get(owner, {})
+        previous = current.get(job_id)
+        score = scores.get(owner)
+        if (previous is not None and len(current) == STORED_NEIGHBOURS
+                and (score is None or score < previous)):
+            # Sliding down a full list may let a job outside it in
+            _recompute(connection, owner)
+            continue
+        updated = {other_id: value for other_id, value in current.items() if other_id != job_id}
+        if score:
+            updated[job_id] = score
+        neighbours = _top(updated)
+        if neighbours != _top(current):
+            _store(connection, owner, neighbours)
+
+def remove_job(connection, job_id):
+    """Drop a deleted job's rows and refill the lists it appeared in"""
+    owners = connection.execute(
+        select(JobSimilarity.job_id).where(JobSimilarity.similar_job_id == job_id)
+    ).scalars().all()
+    connection.execute(delete(JobSimilarity).where(db.or_(
+        JobSimilarity.job_id == job_id, JobSimilarity.similar_job_id == job_id)))
+    for owner in owners:
+        _recompute(connection, owner)
+
+def similar_jobs(job_id, limit=SHOWN_NEIGHBOURS):
+    """Most similar jobs, read from the neighbour table with one indexed lookup"""
+    return Job.query.join(JobSimilarity, JobSimilarity.similar_job_id == Job.id)\
+                    .filter(JobSimilarity.job_id == job_id)\
+                    .order_by(JobSimilarity.rank).limit(limit).all()
+
+def rebuild_similarities(batch_size=500):
+    """Recompute every job's neighbours from the skill index; returns jobs processed"""
+    db.session.query(JobSimilarity).delete()
+    db.session.commit()
+    processed = 0
+    last_id = 0
+    while True:
+        ids = [job_id for (job_id,) in db.session.query(Job.id).filter(Job.id > last_id)
+                                                              .order_by(Job.id).limit(batch_size)]
+        if not ids:
+            break
+        connection = db.session.connection()
+        for job_id in ids:
+            _recompute(connection, job_id)
+        db.session.commit()
+        processed += len(ids)
+        last_id = ids[-1]
+    return processed
+
+# Keep the neighbour table in sync with job writes, inside the same flush
+@event.listens_for(Job, 'after_insert')
+def _similar_for_new_job(mapper, connection, job):
+    refresh_job(connection, job.id)
+
+@event.listens_for(Job, 'after_update')
+def _similar_for_edited_job(mapper, connection, job):
+    if db.inspect(job).attrs.required_skills.history.has_changes():
+        refresh_job(connection, job.id)
+
+@event.listens_for(Job, 'before_delete')
+def _similar_for_deleted_job(mapper, connection, job):
+    remove_job(connection, job.id)
@@ -0,0 +1,100 @@
+from sqlalchemy import event
+from app import db
+from app.models import User, Job, JobSkill, UserSkill
+from app.features import skill_tokens
+
+MAX_TOKEN_LENGTH = 100
+
+def index_tokens(skills_text):
+    """Normalized tokens as stored in the skill index"""
+    return {token[:MAX_TOKEN_LENGTH] for token in skill_tokens(skills_text)}
+
+def _job_rows(job_id, skills_text):
+    return [{'skill': token, 'job_id': job_id} for token in index_tokens(skills_text)]
+
+def _user_rows(user_id, skills_text):
+    return [{'skill': token, 'user_id': user_id} for token in index_tokens(skills_text)]
+
+def candidate_job_ids(skills_text):
+    """Query of job IDs sharing at least one skill token"""
+    tokens = index_tokens(skills_text)
+    return db.session.query(JobSkill.job_id).filter(JobSkill.skill.in_(tokens)).distinct()
+
+def candidate_jobs(skills_text):
+    """Job query restricted to jobs sharing a skill with skills_text"""
+    return Job.query.filter(Job.id.in_(candidate_job_ids(skills_text)))
+
+def candidate_user_ids(skills_text):
+    """Query of user IDs sharing at least one skill token"""
+    tokens = index_tokens(skills_text)
+    return db.session.query(UserSkill.user_id).filter(UserSkill.skill.in_(tokens)).distinct()
+
+def candidate_seekers(skills_text):
+    """Job seeker query restricted to seekers sharing a skill with skills_text"""
+    return User.query.filter(User.user_type == 'job_seeker',
+                             User.id.in_(candidate_user_ids(skills_text)))
+
+def _rebuild(id_column, skills_column, index_model, row_builder, batch_size):
+    db.session.query(index_model).delete()
+    indexed = 0
+    last_id = 0
+    while True:
+        batch = db.session.query(id_column, skills_column)\
+                          .filter(id_column > last_id)\
+                          .order_by(id_column).limit(batch_size).all()
+        if not batch:
+            break
+        rows = []
+        for row_id, skills_text in batch:
+            rows.extend(row_builder(row_id, skills_text))
+        if rows:
+            db.session.execute(index_model.__table__.insert(), rows)
+        indexed += len(batch)
+        last_id = batch[-1][0]
+    return indexed
+
+def rebuild_skill_index(batch_size=500):
+    """Rebuild both indexes; returns (jobs indexed, users indexed)"""
+    jobs = _rebuild(Job.id, Job.required_skills, JobSkill, _job_rows, batch_size)
+    users = _rebuild(User.id, User.skills, UserSkill, _user_rows, batch_size)
+    db.session.commit()
+    return jobs, users
+
+# Keep the indexes in sync with job and user writes, inside the same flush
+@event.listens_for(Job, 'after_insert')
+def _index_new_job(mapper, connection, job):
+    rows = _job_rows(job.id, job.required_skills)
+    if rows:
+        connection.execute(JobSkill.__table__.insert(), rows)
+
+@event.listens_for(Job, 'after_update')
+def _reindex_job(mapper, connection, job):
+    if not db.inspect(job).attrs.required_skills.history.has_changes():
+        return
+    connection.execute(JobSkill.__table__.delete().where(JobSkill.job_id == job.id))
+    rows = _job_rows(job.id, job.required_skills)
+    if rows:
+        connection.execute(JobSkill.__table__.insert(), rows)
+
+@event.listens_for(Job, 'before_delete')
+def _unindex_job(mapper, connection, job):
+    connection.execute(JobSkill.__table__.delete().where(JobSkill.job_id == job.id))
+
+@event.listens_for(User, 'after_insert')
+def _index_new_user(mapper, connection, user):
+    rows = _user_rows(user.id, user.skills)
+    if rows:
+        connection.execute(UserSkill.__table__.insert(), rows)
+
+@event.listens_for(User, 'after_update')
+def _reindex_user(mapper, connection, user):
+    if not db.inspect(user).attrs.skills.history.has_changes():
+        return
+    connection.execute(UserSkill.__table__.delete().where(UserSkill.user_id == user.id))
+    rows = _user_rows(user.id, user.skills)
+    if rows:
+        connection.execute(UserSkill.__table__.insert(), rows)
+
+@event.listens_for(User, 'before_delete')
+def _unindex_user(mapper, connection, user):
+    connection.execute(UserSkill.__table__.delete().where(UserSkill.user_id == user.id))
@@ -0,0 +1,273 @@
+import hashlib
+import os
+import re
+import tempfile
+import time
+from datetime import datetime, timedelta
+from flask import Request, current_app, request, send_file
+from sqlalchemy import event, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from app import db
+from app.models import Application, StoredFile
+
+CHUNK_SIZE = 64 * 1024
+
+# Stored files are addressed by content hash, so their URLs never go stale
+CACHE_MAX_AGE = 365 * 24 * 3600  # Seconds
+
+# Spool files are created 0600; stored files get the mode a plain open()
+# would give them, so nginx (CERTIFICATE_ACCEL_REDIRECT) can read them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+FILE_MODE = 0o666 & ~_UMASK
+
+def storage_dir():
+    return current_app.config['CERTIFICATE_UPLOAD_DIR']
+
+def content_path(sha256):
+    """Where the file with this digest is stored: <dir>/ab/ab12..."""
+    return os.path.join(storage_dir(), sha256[:2], sha256)
+
+def preview_path(sha256):
+    """First-page PNG rendered for the file with this digest"""
+    return content_path(sha256) + '.png'
+
+class HashingSpool:
+    """Writable upload target that hashes the bytes as they arrive.
+
+    The data goes to a temporary file inside the storage directory, so
+    storing it afterwards is a rename: no second copy, no re-read to hash.
+    Closing it without storing deletes the temporary file.
+    """
+
+    def __init__(self, directory):
+        spool_dir = os.path.join(directory, 'tmp')
+        os.makedirs(spool_dir, exist_ok=True)
+        self._file = tempfile.NamedTemporaryFile(dir=spool_dir, delete=False)
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.stored = False
+
+    def write(self, data):
+        self.sha256.update(data)
+        self.size += len(data)
+        return self._file.write(data)
+
+    def read(self, size=-1):
+        return self._file.read(size)
+
+    def readline(self, size=-1):
+        return self._file.readline(size)
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        return self._file.seek(offset, whence)
+
+    def tell(self):
+        return self._file.tell()
+
+    def close(self):
+        self._file.close()
+        if not self.stored and os.path.exists(self._file.name):
+            os.unlink(self._file.name)
+
+    def store(self, path):
+        """Move the spooled file to path, or drop it if path already holds the same bytes"""
+        self._file.close()
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.exists(path):
+            os.unlink(self._file.name)
+        else:
+            os.chmod(self._file.name, FILE_MODE)
+            os.replace(self._file.name, path)
+        self.stored = True
+
+class UploadRequest(Request):
+    """Request whose file parts are parsed straight into a HashingSpool"""
+
+    def _get_file_stream(self, total_content_length, content_type, filename=None,
+                         content_length=None):
+        return HashingSpool(storage_dir())
+
+def _touch(digest, size, content_type):
+    """Insert the StoredFile row, or mark an existing one as just uploaded"""
+    now = datetime.utcnow()
+    values = {'sha256': digest, 'size': size, 'content_type': content_type,
+              'ref_count': 0, 'created_at': now, 'updated_at': now}
+    dialect = db.engine.dialect.name
+    with db.engine.begin() as connection:
+        if dialect in ('sqlite', 'postgresql'):
+            insert = sqlite_insert if dialect == 'sqlite' else postgresql_insert
+            connection.execute(insert(StoredFile.__table__).values(**values).on_conflict_do_update(
+                index_elements=['sha256'], set_={'updated_at': now}))
+        elif connection.execute(StoredFile.__table__.update()
+                                .where(StoredFile.sha256 == digest)
+                                .values(updated_at=now)).rowcount == 0:
+            connection.execute(StoredFile.__table__.insert().values(**values))
+
+def store_upload(file_storage):
+    """Put an uploaded file into content-addressed storage; returns its SHA-256 hex digest.
+
+    The row is written before the file is placed so a concurrent prune
+    never removes a file that is about to be referenced.
+    """
+    spool = file_storage.stream
+    if not isinstance(spool, HashingSpool):
+        # Parsed without UploadRequest: hash while copying in chunks
+        spool = HashingSpool(storage_dir())
+        for chunk in iter(lambda: file_storage.stream.read(CHUNK_SIZE), b''):
+            spool.write(chunk)
+    digest = spool.sha256.hexdigest()
+    _touch(digest, spool.size, file_storage.mimetype or None)
+    spool.store(content_path(digest))
+    return digest
+
+def send_stored_file(stored, download_name, preview=False):
+    """Response for a stored file (or its preview) with Range and conditional GET support.
+
+    The bytes go out through the WSGI server's file wrapper (sendfile), or
+    through nginx when CERTIFICATE_ACCEL_REDIRECT names an internal
+    location mapped onto CERTIFICATE_UPLOAD_DIR. Certificates are always
+    sent as PDFs, never as the type the uploader claimed, and only
+    files that passed the PDF check are shown inline.
+    """
+    path = preview_path(stored.sha256) if preview else content_path(stored.sha256)
+    mimetype = 'image/png' if preview else 'application/pdf'
+    etag = stored.sha256 + ('-preview' if preview else '')
+    inline = preview or stored.check_status == 'valid'
+    accel_prefix = current_app.config['CERTIFICATE_ACCEL_REDIRECT']
+
+    if accel_prefix:
+        response = current_app.response_class(mimetype=mimetype)
+        relative = os.path.relpath(path, storage_dir()).replace(os.sep, '/')
+        response.headers['X-Accel-Redirect'] = accel_prefix.rstrip('/') + '/' + relative
+        response.headers.set('Content-Disposition', 'inline' if inline else 'attachment',
+                             filename=download_name)
+        response.set_etag(etag)
+        response.make_conditional(request)
+    else:
+        response = send_file(os.path.abspath(path), mimetype=mimetype, as_attachment=not inline,
+                             download_name=download_name, conditional=True, etag=etag)
+
+    # Private: certificates must never land in shared caches
+    response.cache_control.no_cache = None
+    response.cache_control.public = None
+    response.cache_control.private = True
+    response.cache_control.max_age = CACHE_MAX_AGE
+    response.cache_control.immutable = True
+    response.accept_ranges = 'bytes'
+    response.headers['X-Content-Type-Options'] = 'nosniff'
+    return response
+
+def prune_unreferenced(grace=timedelta(hours=24)):
+    """Delete stored files no application has used for longer than grace; returns how many.
+
+    Also removes spool files left behind by interrupted uploads.
+    """
+    cutoff = datetime.utcnow() - grace
+    unreferenced = (StoredFile.ref_count <= 0, StoredFile.updated_at < cutoff)
+    removed = 0
+    for digest in db.session.execute(select(StoredFile.sha256).where(*unreferenced)).scalars().all():
+        # Re-checked per row: an upload may have touched it since the select
+        deleted = db.session.execute(StoredFile.__table__.delete()
+                                     .where(StoredFile.sha256 == digest, *unreferenced)).rowcount
+        db.session.commit()
+        if deleted:
+            for path in (content_path(digest), preview_path(digest)):
+                if os.path.exists(path):
+                    os.unlink(path)
+            removed += 1
+
+    spool_dir = os.path.join(storage_dir(), 'tmp')
+    if os.path.isdir(spool_dir):
+        for entry in os.scandir(spool_dir):
+            if entry.stat().st_mtime < time.time() - grace.total_seconds():
+                os.unlink(entry.path)
+    return removed
+
+def repair_file_modes():
+    """Give files stored with the spool's 0600 mode FILE_MODE instead; returns how many"""
+    repaired = 0
+    if not os.path.isdir(storage_dir()):
+        return repaired
+    for entry in os.scandir(storage_dir()):
+        if not entry.is_dir() or entry.name == 'tmp':
+            continue
+        for stored in os.scandir(entry.path):
+            if stored.is_file() and stored.stat().st_mode & 0o777 != FILE_MODE:
+                os.chmod(stored.path, FILE_MODE)
+                repaired += 1
+    return repaired
+
+# Applications saved before content addressing kept "Certificate: <uuid>_<name>"
+# as the last line of accommodation_request, with the file directly in the directory
+LEGACY_CERTIFICATE_LINE = re.compile(r'\nCertificate: (.*)$')
+
+def import_legacy_certificates(batch_size=500):
+    """Move legacy certificate files into the store; returns (imported, missing files)"""
+    imported = missing = 0
+    last_id = 0
+    while True:
+        batch = Application.query.filter(Application.id > last_id,
+                                         Application.certificate_sha256 == None,
+                                         Application.accommodation_request.like('%Certificate: %'))\
+                                 .order_by(Application.id).limit(batch_size).all()
+        if not batch:
+            break
+        moved = []
+        for application in batch:
+            match = LEGACY_CERTIFICATE_LINE.search(application.accommodation_request)
+            if not match:
+                continue
+            filename = os.path.basename(match.group(1).strip())
+            if filename and filename != 'None':
+                legacy_path = os.path.join(storage_dir(), filename)
+                if not os.path.exists(legacy_path):
+                    missing += 1
+                    continue
+                spool = HashingSpool(storage_dir())
+                with open(legacy_path, 'rb') as legacy:
+                    for chunk in iter(lambda: legacy.read(CHUNK_SIZE), b''):
+                        spool.write(chunk)
+                digest = spool.sha256.hexdigest()
+                _touch(digest, spool.size, 'application/pdf')
+                spool.store(content_path(digest))
+                application.certificate_sha256 = digest
+                application.certificate_name = filename.split('_', 1)[-1]
+                moved.append(legacy_path)
+                imported += 1
+            application.accommodation_request = application.accommodation_request[:match.start()]
+        db.session.commit()
+        # Legacy files go only once their applications point at the stored copy
+        for legacy_path in moved:
+            os.unlink(legacy_path)
+        last_id = batch[-1].id
+    return imported, missing
+
+# Reference counts follow the applications pointing at each file, inside the same flush
+def _adjust_references(connection, digest, delta):
+    connection.execute(StoredFile.__table__.update()
+                       .where(StoredFile.sha256 == digest)
+                       .values(ref_count=StoredFile.ref_count + delta, updated_at=datetime.utcnow()))
+
+@event.listens_for(Application, 'after_insert')
+def _reference_certificate(mapper, connection, application):
+    if application.certificate_sha256:
+        _adjust_references(connection, application.certificate_sha256, 1)
+
+@event.listens_for(Application, 'after_update')
+def _rereference_certificate(mapper, connection, application):
+    history = db.inspect(application).attrs.certificate_sha256.history
+    if not history.has_changes():
+        return
+    for digest in history.deleted:
+        if digest:
+            _adjust_references(connection, digest, -1)
+    for digest in history.added:
+        if digest:
+            _adjust_references(connection, digest, 1)
+
+@event.listens_for(Application, 'after_delete')
+def _release_certificate(mapper, connection, application):
+    if application.certificate_sha256:
+        _adjust_references(connection, application.certificate_sha256, -1)
@@ -0,0 +1,131 @@
+import json
+import multiprocessing
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from app import db
+from app.models import Job, MatchTask
+from app.matching_engine import JobMatchingEngine
+from app.certificate_check import check_application_certificate
+
+ACTIVE_STATUSES = ('queued', 'running')
+
+# Task kind -> handler call
+TASK_HANDLERS = {
+    'generate_user': JobMatchingEngine.generate_matches_for_user,
+    'rematch_user': JobMatchingEngine.rematch_user,
+    'rematch_job': JobMatchingEngine.rematch_job,
+    'check_certificate': check_application_certificate,
+}
+
+# Task kinds that (re)score a seeker against the whole catalogue
+USER_TASK_KINDS = ('generate_user', 'rematch_user')
+
+_executor = None
+_worker_app = None
+
+def _init_worker():
+    """Process pool initializer: each worker process owns its own app and engine"""
+    global _worker_app
+    from app import create_app
+    _worker_app = create_app()
+
+def _run_in_worker(task_id):
+    with _worker_app.app_context():
+        run_task(task_id)
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # Spawned workers never inherit the parent's open DB connections
+        _executor = ProcessPoolExecutor(
+            max_workers=current_app.config['MATCH_WORKERS'],
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker
+        )
+    return _executor
+
+def _report_failure(future):
+    error = future.exception()
+    if error:
+        print(f"⚠️ Match task worker error: {error}")
+
+def enqueue(kind, target_id):
+    """Queue a match task (coalescing with an identical queued one) and dispatch it"""
+    task = MatchTask.query.filter_by(kind=kind, target_id=target_id, status='queued').first()
+    if task:
+        return task
+
+    task = MatchTask(kind=kind, target_id=target_id)
+    db.session.add(task)
+    db.session.commit()
+
+    if current_app.config['MATCH_TASKS_INLINE']:
+        run_task(task.id)
+    else:
+        _get_executor().submit(_run_in_worker, task.id).add_done_callback(_report_failure)
+    return task
+
+def run_task(task_id):
+    """Claim and execute one queued task; returns True if this call ran it"""
+    claimed = MatchTask.query.filter_by(id=task_id, status='queued')\
+                             .update({'status': 'running', 'started_at': datetime.utcnow()})
+    db.session.commit()
+    if not claimed:
+        return False
+
+    task = MatchTask.query.get(task_id)
+    try:
+        result = TASK_HANDLERS[task.kind](task.target_id)
+        task.result = json.dumps(result)
+        task.status = 'done'
+    except Exception:
+        db.session.rollback()
+        task = MatchTask.query.get(task_id)
+        task.status = 'failed'
+        task.error = traceback.format_exc()
+    task.finished_at = datetime.utcnow()
+    db.session.commit()
+    return True
+
+def active_user_task(user_id):
+    """Queued or running catalogue task for a seeker, if any"""
+    return MatchTask.query.filter(
+        MatchTask.kind.in_(USER_TASK_KINDS),
+        MatchTask.target_id == user_id,
+        MatchTask.status.in_(ACTIVE_STATUSES)
+    ).first()
+
+def needs_generation(user_id):
+    """Whether the seeker's pending queue can be refilled.
+    
+    True if the seeker was never scored, the last run stopped at the top-K
+    cap with candidates left over, or jobs were posted since that run.
+    """
+    last_task = MatchTask.query.filter(
+        MatchTask.kind.in_(USER_TASK_KINDS),
+        MatchTask.target_id == user_id,
+        MatchTask.status == 'done'
+    ).order_by(MatchTask.finished_at.desc()).first()
+    if last_task is None:
+        return True
+    if (json.loads(last_task.result or '{}') or {}).get('more'):
+        return True
+    newest_job = db.session.query(db.func.max(Job.created_at)).scalar()
+    return newest_job is not None and newest_job > last_task.finished_at
+
+def drain(requeue_after=timedelta(minutes=10)):
+    """Run every queued task in this process; requeues tasks stuck in 'running'"""
+    stale_before = datetime.utcnow() - requeue_after
+    MatchTask.query.filter(MatchTask.status == 'running', MatchTask.started_at < stale_before)\
+                   .update({'status': 'queued'}, synchronize_session=False)
+    db.session.commit()
+
+    processed = 0
+    while True:
+        task = MatchTask.query.filter_by(status='queued').order_by(MatchTask.id).first()
+        if not task:
+            return processed
+        if run_task(task.id):
+            processed += 1
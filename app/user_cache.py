@@ -0,0 +1,81 @@
+import uuid
+from flask import current_app, has_request_context, request, session
+from sqlalchemy import event
+from sqlalchemy.orm import defer, make_transient_to_detached
+from app import db
+from app.models import User
+from app.utils import TTLCache
+
+# Large text columns left out of the per-request user load; read on first access.
+# skills stays loaded: the dashboard checks it on every view.
+DEFERRED_USER_COLUMNS = ('accessibility_preferences', 'accessibility_needs',
+                         'work_preferences', 'skill_list', 'location_terms')
+
+# Session key holding the stamp of the user's last own write. The stamp
+# travels with the user's cookie, so every worker sees a write made on
+# another one at the next request, without waiting for the TTL.
+STAMP_KEY = 'user_cache_stamp'
+
+_cache = None
+
+def _get_cache():
+    global _cache
+    if _cache is None:
+        _cache = TTLCache(maxsize=current_app.config['USER_CACHE_SIZE'],
+                          ttl=current_app.config['USER_CACHE_TTL'])
+    return _cache
+
+def _snapshot(user):
+    # Loaded column values only; deferred columns stay unloaded
+    state = db.inspect(user)
+    return {attr.key: state.dict[attr.key] for attr in state.mapper.column_attrs
+            if attr.key in state.dict}
+
+def _query_user(user_id):
+    return User.query.options(*[defer(getattr(User, name)) for name in DEFERRED_USER_COLUMNS])\
+                     .get(user_id)
+
+def load_user(user_id):
+    """User for the session cookie, from the identity cache when possible.
+
+    The cached copy is attached to the request's session without a query
+    (merge with load=False); deferred columns load lazily if a view reads them.
+    A copy is only used while the session's stamp matches the one it was
+    cached under.
+    Requests that may write (anything but GET/HEAD) always read the row: a
+    snapshot up to USER_CACHE_TTL old would feed stale fields into the update.
+    """
+    if not current_app.config['USER_CACHE_TTL'] or request.method not in ('GET', 'HEAD'):
+        return _query_user(user_id)
+
+    cache = _get_cache()
+    stamp = session.get(STAMP_KEY)
+    cached = cache.get(user_id)
+    if cached is None or cached[0] != stamp:
+        user = _query_user(user_id)
+        if user is not None:
+            cache.put(user_id, (stamp, _snapshot(user)))
+        return user
+
+    user = User(**cached[1])
+    make_transient_to_detached(user)
+    return db.session.merge(user, load=False)
+
+def invalidate_user(user_id):
+    """Drop a cached user in this process and, for the user's own writes, in every process.
+
+    Writes made outside the user's session (CLI, other logins) reach
+    other processes after USER_CACHE_TTL.
+    """
+    if _cache is not None:
+        _cache.pop(user_id)
+    if has_request_context() and session.get('_user_id') == str(user_id):
+        session[STAMP_KEY] = uuid.uuid4().hex
+
+@event.listens_for(User, 'after_update')
+def _invalidate_updated(mapper, connection, user):
+    invalidate_user(user.id)
+
+@event.listens_for(User, 'after_delete')
+def _invalidate_deleted(mapper, connection, user):
+    invalidate_user(user.id)
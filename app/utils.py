@@ -1,4 +1,7 @@
 import json
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 
 def format_date(date):
@@ -46,3 +49,63 @@ def get_application_status_color(status):
         'rejected': 'danger'
     }
     return status_colors.get(status, 'secondary')
+
+def batched(items, size):
+    """Consecutive lists of at most size items"""
+    items = list(items)
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+class LRUCache:
+    """Small bounded, thread-safe mapping that evicts the least recently used key"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                self._data.move_to_end(key)
+            except KeyError:
+                return default
+            return self._data[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+class TTLCache(LRUCache):
+    """LRU cache whose entries also expire ttl seconds after they were stored"""
+
+    def __init__(self, maxsize, ttl):
+        super().__init__(maxsize)
+        self.ttl = ttl
+
+    def get(self, key, default=None):
+        entry = super().get(key)
+        if entry is None:
+            return default
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            self.pop(key)
+            return default
+        return value
+
+    def put(self, key, value):
+        super().put(key, (time.monotonic() + self.ttl, value))
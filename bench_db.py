@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Concurrent read/write benchmark for the SQLite profiles.
+
+Runs several worker processes (like gunicorn workers) against a fresh
+database per profile: each one serves /jobs and /api/jobs requests and
+updates jobs for a fixed time. Reports throughput and lock errors.
+
+    python bench_db.py [--workers 4] [--seconds 10] [--jobs 2000] [--write-ratio 0.2]
+"""
+import argparse
+import contextlib
+import io
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+PROFILES = ('default', 'performance')
+
+def _setup(database_url, profile, job_count):
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['SQLITE_PROFILE'] = profile
+    from app import create_app, db
+    from app.models import User, Job
+    from app.migrations import upgrade
+    app = create_app()
+    with app.app_context(), contextlib.redirect_stdout(io.StringIO()):
+        upgrade()
+        employer = User(username='bench', email='bench@example.com',
+                        user_type='employer', password_hash='x')
+        db.session.add(employer)
+        db.session.commit()
+        for index in range(job_count):
+            db.session.add(Job(
+                title=f'Developer {index}', company=f'Company {index % 50}',
+                description='Build accessible web applications with Python and React',
+                required_skills='Python, React, SQL', experience_required='1-3',
+                location=random.choice(['Remote', 'New York, NY', 'Austin, TX']),
+                work_type=random.choice(['remote', 'hybrid', 'onsite']),
+                salary_range='$60,000 - $80,000', posted_by=employer.id
+            ))
+        db.session.commit()
+
+def _worker(database_url, profile, seconds, write_ratio, job_count, results):
+    os.environ['DATABASE_URL'] = database_url
+    os.environ['SQLITE_PROFILE'] = profile
+    from app import create_app, db
+    from app.models import Job
+    app = create_app()
+    client = app.test_client()
+    reads = writes = errors = 0
+    latencies = []
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        started = time.monotonic()
+        try:
+            if random.random() < write_ratio:
+                with app.app_context():
+                    job = db.session.get(Job, random.randint(1, job_count))
+                    job.location = random.choice(['Remote', 'Chicago, IL', 'Austin, TX'])
+                    db.session.commit()
+                writes += 1
+            else:
+                url = random.choice(['/jobs', '/jobs?work_type=remote', '/api/jobs?limit=50'])
+                response = client.get(url)
+                response.get_data()
+                if response.status_code != 200:
+                    raise RuntimeError(response.status_code)
+                reads += 1
+        except Exception as error:
+            errors += 1
+            if 'locked' not in str(error):
+                print(f"⚠️ {profile}: {error}")
+            with app.app_context():
+                db.session.rollback()
+        latencies.append(time.monotonic() - started)
+    results.put((reads, writes, errors, latencies))
+
+def run_profile(profile, args):
+    directory = tempfile.mkdtemp(prefix=f'bench-{profile}-')
+    database_url = 'sqlite:///' + os.path.join(directory, 'bench.db')
+    context = multiprocessing.get_context('spawn')
+
+    setup = context.Process(target=_setup, args=(database_url, profile, args.jobs))
+    setup.start()
+    setup.join()
+
+    results = context.Queue()
+    workers = [context.Process(target=_worker, args=(database_url, profile, args.seconds,
+                                                     args.write_ratio, args.jobs, results))
+               for _ in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    totals = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+
+    reads = sum(t[0] for t in totals)
+    writes = sum(t[1] for t in totals)
+    errors = sum(t[2] for t in totals)
+    latencies = sorted(latency for t in totals for latency in t[3])
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0
+    return {
+        'profile': profile,
+        'ops_per_second': (reads + writes) / args.seconds,
+        'reads': reads,
+        'writes': writes,
+        'errors': errors,
+        'p95_ms': p95,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--jobs', type=int, default=2000)
+    parser.add_argument('--write-ratio', type=float, default=0.2)
+    args = parser.parse_args()
+
+    print(f"🏁 {args.workers} workers, {args.seconds:g}s, {args.jobs} jobs, "
+          f"{args.write_ratio:.0%} writes")
+    rows = [run_profile(profile, args) for profile in PROFILES]
+    print(f"{'profile':<12} {'ops/s':>8} {'reads':>7} {'writes':>7} {'errors':>7} {'p95 ms':>8}")
+    for row in rows:
+        print(f"{row['profile']:<12} {row['ops_per_second']:>8.1f} {row['reads']:>7} "
+              f"{row['writes']:>7} {row['errors']:>7} {row['p95_ms']:>8.1f}")
+
+if __name__ == '__main__':
+    main()
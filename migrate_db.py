@@ -1,98 +1,36 @@
-import sqlite3
-
-# Connect to database
-conn = sqlite3.connect('pwd_jobs.db')
-cursor = conn.cursor()
-
-# Add new columns to User table
-try:
-    cursor.execute("ALTER TABLE user ADD COLUMN skills TEXT")
-    print("✅ Added skills column to User")
-except:
-    print("⚠️ skills column already exists")
-
-try:
-    cursor.execute("ALTER TABLE user ADD COLUMN experience_level VARCHAR(50)")
-    print("✅ Added experience_level column to User")
-except:
-    print("⚠️ experience_level column already exists")
-
-try:
-    cursor.execute("ALTER TABLE user ADD COLUMN preferred_location VARCHAR(200)")
-    print("✅ Added preferred_location column to User")
-except:
-    print("⚠️ preferred_location column already exists")
-
-try:
-    cursor.execute("ALTER TABLE user ADD COLUMN salary_expectation VARCHAR(100)")
-    print("✅ Added salary_expectation column to User")
-except:
-    print("⚠️ salary_expectation column already exists")
-
-try:
-    cursor.execute("ALTER TABLE user ADD COLUMN accessibility_needs TEXT")
-    print("✅ Added accessibility_needs column to User")
-except:
-    print("⚠️ accessibility_needs column already exists")
-
-try:
-    cursor.execute("ALTER TABLE user ADD COLUMN work_preferences TEXT")
-    print("✅ Added work_preferences column to User")
-except:
-    print("⚠️ work_preferences column already exists")
-
-# Add new columns to Job table
-try:
-    cursor.execute("ALTER TABLE job ADD COLUMN required_skills TEXT")
-    print("✅ Added required_skills column to Job")
-except:
-    print("⚠️ required_skills column already exists")
-
-try:
-    cursor.execute("ALTER TABLE job ADD COLUMN experience_required VARCHAR(50)")
-    print("✅ Added experience_required column to Job")
-except:
-    print("⚠️ experience_required column already exists")
-
-try:
-    cursor.execute("ALTER TABLE job ADD COLUMN work_type VARCHAR(50)")
-    print("✅ Added work_type column to Job")
-except:
-    print("⚠️ work_type column already exists")
-
-try:
-    cursor.execute("ALTER TABLE job ADD COLUMN disability_friendly BOOLEAN DEFAULT 1")
-    print("✅ Added disability_friendly column to Job")
-except:
-    print("⚠️ disability_friendly column already exists")
-
-# Create JobMatch table
-try:
-    cursor.execute('''
-        CREATE TABLE job_match (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            user_id INTEGER NOT NULL,
-            job_id INTEGER NOT NULL,
-            match_score FLOAT NOT NULL,
-            skills_match FLOAT DEFAULT 0.0,
-            experience_match FLOAT DEFAULT 0.0,
-            location_match FLOAT DEFAULT 0.0,
-            accessibility_match FLOAT DEFAULT 0.0,
-            salary_match FLOAT DEFAULT 0.0,
-            match_details TEXT,
-            status VARCHAR(50) DEFAULT 'pending',
-            created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
-            FOREIGN KEY (user_id) REFERENCES user (id),
-            FOREIGN KEY (job_id) REFERENCES job (id)
-        )
-    ''')
-    print("✅ Created JobMatch table")
-except:
-    print("⚠️ JobMatch table already exists")
-
-# Commit changes
-conn.commit()
-conn.close()
-
-print("\n🎉 Database migration completed!")
-print("You can now run: python run.py")
+#!/usr/bin/env python3
+"""Apply pending schema migrations to the database named by DATABASE_URL.
+
+    python migrate_db.py          # apply pending revisions
+    python migrate_db.py status   # list applied and pending revisions
+    python migrate_db.py remask   # re-encode keyword masks after editing the dictionary
+"""
+import os
+import sys
+from app import create_app
+from app.migrations import MIGRATIONS, applied_versions, upgrade
+
+app = create_app()
+
+if __name__ == '__main__':
+    with app.app_context():
+        if len(sys.argv) > 1 and sys.argv[1] == 'status':
+            applied = applied_versions()
+            for migration in MIGRATIONS:
+                mark = '✅' if migration.version in applied else '⏳'
+                print(f"{mark} {migration.version}: {migration.description}")
+            sys.exit(0)
+
+        if len(sys.argv) > 1 and sys.argv[1] == 'remask':
+            from app.matching_engine import JobMatchingEngine
+            remasked = JobMatchingEngine.recompute_accessibility_masks()
+            print(f"✅ Re-encoded accessibility keywords for {remasked} users and jobs")
+            sys.exit(0)
+
+        batch_size = int(os.environ.get('MIGRATION_BATCH_SIZE', 500))
+        applied = upgrade(batch_size)
+        if applied:
+            print(f"\n🎉 Applied {len(applied)} migrations!")
+        else:
+            print("✅ Database is up to date")
+        print("You can now run: python run.py")
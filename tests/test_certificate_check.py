@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+from app.certificate_check import InvalidCertificate, _pdf_string, inspect_pdf
+
+def one_page_pdf(info):
+    """Minimal one-page PDF whose /Info dictionary holds info"""
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>',
+        b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] >>',
+        b'<< ' + info + b' >>',
+    ]
+    data = b'%PDF-1.4\n'
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(data))
+        data += b'%d 0 obj\n' % number + body + b'\nendobj\n'
+    xref = len(data)
+    data += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    data += b''.join(b'%010d 00000 n \n' % offset for offset in offsets)
+    data += b'trailer\n<< /Size %d /Root 1 0 R /Info 4 0 R >>\n' % (len(objects) + 1)
+    return data + b'startxref\n%d\n%%%%EOF\n' % xref
+
+class PdfStringTest(unittest.TestCase):
+
+    def test_literal_string(self):
+        self.assertEqual(_pdf_string(b'(Cert \\(2019\\))'), 'Cert (2019)')
+
+    def test_hex_string(self):
+        self.assertEqual(_pdf_string(b'<48 65 6C 6C 6F>'), 'Hello')
+
+    def test_odd_length_hex_string(self):
+        # A missing final digit counts as 0: <48656C6C6F2> is "Hello "
+        self.assertEqual(_pdf_string(b'<48656C6C6F2>'), 'Hello ')
+
+class InspectPdfTest(unittest.TestCase):
+
+    def inspect(self, data):
+        handle, path = tempfile.mkstemp(suffix='.pdf')
+        with os.fdopen(handle, 'wb') as pdf:
+            pdf.write(data)
+        self.addCleanup(os.unlink, path)
+        return inspect_pdf(path)
+
+    def test_valid_pdf(self):
+        info = self.inspect(one_page_pdf(b'/Title (Disability Certificate)'))
+        self.assertEqual(info['version'], '1.4')
+        self.assertEqual(info['pages'], 1)
+        self.assertEqual(info['metadata'], {'title': 'Disability Certificate'})
+
+    def test_odd_length_hex_title(self):
+        info = self.inspect(one_page_pdf(b'/Title <48656C6C6F2>'))
+        self.assertEqual(info['metadata'], {'title': 'Hello '})
+
+    def test_truncated_pdf(self):
+        with self.assertRaises(InvalidCertificate):
+            self.inspect(one_page_pdf(b'/Title (x)')[:-20])
+
+if __name__ == '__main__':
+    unittest.main()
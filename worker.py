@@ -0,0 +1,17 @@
+#!/usr/bin/env python3
+"""Background worker: runs match tasks left in the queue (e.g. after a web restart)"""
+import os
+import time
+from app import create_app
+from app.tasks import drain
+
+app = create_app()
+
+if __name__ == '__main__':
+    interval = int(os.environ.get('MATCH_WORKER_POLL_SECONDS', 5))
+    with app.app_context():
+        while True:
+            processed = drain()
+            if processed:
+                print(f"✅ Processed {processed} match tasks")
+            time.sleep(interval)